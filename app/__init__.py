@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import gzip
+
 from dash import Dash
 import dash_bootstrap_components as dbc
-from flask import Flask
+from flask import Flask, Response, request
 
-from app.auth.session import DatabaseSessionInterface
+from app.auth.session import DatabaseSessionInterface, StaticRequestFilteringSessionInterface
 from app.core.settings import Settings, get_settings
 
 
@@ -18,9 +20,53 @@ def create_flask_app(settings: Settings | None = None) -> Flask:
         PERMANENT_SESSION_LIFETIME=settings.session_lifetime,
     )
     server.session_interface = DatabaseSessionInterface(settings=settings)
+    configure_response_compression(server, min_size=settings.gzip_min_size_bytes)
     return server
 
 
+COMPRESSIBLE_MIMETYPES = frozenset({"application/json", "application/javascript", "text/css", "text/html"})
+
+
+def configure_response_compression(server: Flask, min_size: int = 1024) -> None:
+    """Gzip large text responses such as callback payloads carrying map figures."""
+    if min_size <= 0:
+        return
+
+    @server.after_request
+    def _gzip_response(response: Response) -> Response:
+        if (
+            response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code >= 300
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+        ):
+            return response
+        payload = response.get_data()
+        if len(payload) < min_size:
+            return response
+        response.set_data(gzip.compress(payload, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+        return response
+
+
+def configure_static_session_bypass(dash_app: Dash) -> None:
+    """Skip session load/save for Dash assets, component bundles and Flask static files."""
+    server = dash_app.server
+    prefix = dash_app.config.routes_pathname_prefix
+    server.session_interface = StaticRequestFilteringSessionInterface(
+        server.session_interface,
+        (
+            f"{prefix}{dash_app.config.assets_url_path.strip('/')}/",
+            f"{prefix}_dash-component-suites/",
+            f"{prefix}_favicon.ico",
+            f"{server.static_url_path}/",
+        ),
+    )
+
+
 def create_dash_app(settings: Settings | None = None) -> Dash:
     """Instantiate Dash with Bootstrap styling and core configuration."""
     settings = settings or get_settings()
@@ -35,9 +81,9 @@ def create_dash_app(settings: Settings | None = None) -> Dash:
     )
 
     # Placeholder layouts; will be extended as modules are implemented.
-    from app.ui.layout import get_layout  # lazy import to avoid circular deps
-    from app.ui.routes import register_routes
+    from app.ui.routes import register_routes, serve_layout  # lazy import to avoid circular deps
 
-    dash_app.layout = get_layout()
+    dash_app.layout = serve_layout
     register_routes(dash_app)
+    configure_static_session_bypass(dash_app)
     return dash_app
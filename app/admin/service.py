@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Iterator, Mapping, Sequence
@@ -118,9 +119,36 @@ class AdminService:
         self.settings = settings or get_settings()
         self.session_factory = session_factory or get_auth_session_factory(self.settings)
         self._auth_service = AuthService(self.settings)
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run several operations in one session and commit them together.
+
+        The shared session is per thread. A nested transaction() is a no-op that joins the outer one,
+        and operations inside it only flush. If any of them raises, the error has to leave the
+        outermost block: that block rolls back everything done so far. An error caught inside the
+        block does not undo the operations already flushed, and they are committed with the rest.
+        """
+        if getattr(self._local, "session", None) is not None:
+            yield
+            return
+        with self._session_scope() as session:
+            self._local.session = session
+            try:
+                yield
+            finally:
+                self._local.session = None
 
     @contextmanager
     def _session_scope(self) -> Iterator[SASession]:
+        shared = getattr(self._local, "session", None)
+        if shared is not None:
+            # Inside transaction(): errors propagate unflushed and the outermost scope rolls back.
+            yield shared
+            shared.flush()
+            return
+
         session = self.session_factory()
         try:
             yield session
@@ -0,0 +1,78 @@
+(function () {
+  // Figures for the "top client activities" report are built in the browser from the
+  // category store; layout constants arrive from the server via the figure config store.
+  const namespace = (window.dash_clientside = window.dash_clientside || {});
+  const EMPTY_SLICE = { clients: [], values: [], text: [] };
+
+  function emptyFigure(message, config) {
+    const layout = Object.assign({ template: config.template }, config.emptyLayout);
+    layout.annotations = [Object.assign({}, config.emptyAnnotation, { text: message })];
+    return { data: [], layout };
+  }
+
+  function barTrace(slice, metric, sign, axis, category, period, config) {
+    return {
+      type: "bar",
+      orientation: "h",
+      name: config.metricLabels[metric],
+      x: sign > 0 ? slice.values : slice.values.map((value) => -value),
+      y: slice.clients,
+      marker: { color: config.colors[metric] },
+      customdata: slice.clients.map((client) => ({ category, client, period, metric })),
+      text: slice.text,
+      textfont: config.textFont,
+      hovertemplate: `Клиент: %{y}<br>${config.metricLabels[metric]}: %{text} млн руб.<extra></extra>`,
+      width: 0.7,
+      xaxis: axis.x,
+      yaxis: axis.y,
+    };
+  }
+
+  function periodFigure(entry, period, config) {
+    // Columns arrive from the server already filtered, sorted, cut to the top clients and labelled.
+    const slices = (entry.periods && entry.periods[period]) || {};
+    const positive = slices.issued || EMPTY_SLICE;
+    const negative = slices.repaid || EMPTY_SLICE;
+    if (!positive.clients.length && !negative.clients.length) {
+      return emptyFigure(config.messages.noData, config);
+    }
+
+    const localLimit = Math.max(0, ...positive.values, ...negative.values);
+    const limit = entry.max > 0 ? entry.max : localLimit > 0 ? localLimit : 1;
+    const range = [-limit * 1.05, limit * 1.05];
+    const top = { x: "x", y: "y" };
+    const bottom = { x: "x2", y: "y2" };
+
+    const layout = Object.assign({ template: config.template }, config.periodLayout);
+    layout.xaxis = Object.assign({}, config.periodLayout.xaxis, { range });
+    layout.xaxis2 = Object.assign({}, config.periodLayout.xaxis2, { range });
+    const periodLabel = config.periodLabels[period];
+    layout.annotations = periodLabel ? [Object.assign({}, config.periodAnnotation, { text: periodLabel })] : [];
+
+    return {
+      data: [
+        barTrace(positive, "issued", 1, top, entry.name, period, config),
+        barTrace(negative, "repaid", -1, bottom, entry.name, period, config),
+      ],
+      layout,
+    };
+  }
+
+  function render(store, config) {
+    const categories = store && Array.isArray(store.categories) ? store.categories : [];
+    const figures = [];
+    for (let idx = 0; idx < config.maxCategories; idx += 1) {
+      const entry = categories[idx];
+      config.periods.forEach((period) => {
+        figures.push(
+          entry && entry.periods
+            ? periodFigure(entry, period, config)
+            : emptyFigure(config.messages.noCategory, config)
+        );
+      });
+    }
+    return figures;
+  }
+
+  namespace.client_activities = { render };
+})();
@@ -0,0 +1,32 @@
+(function () {
+  // Navbar visibility and login redirects are decided without a server round-trip.
+  // Permissions are rendered into perms-store with the layout, which reloads after login and logout;
+  // if the server session ends some other way, render_page sends the page back through /login.
+  const namespace = (window.dash_clientside = window.dash_clientside || {});
+
+  function toggleNav(_identity, perms, config) {
+    if (!perms || !perms.authenticated) {
+      return [config.hidden, config.adminHidden, true, config.hidden, true];
+    }
+    return [config.navLinks, perms.admin ? config.navItem : config.adminHidden, !perms.admin, config.navItem, false];
+  }
+
+  function redirect(pathname, perms, config) {
+    const path = pathname || "/";
+    if (!perms || !perms.authenticated) {
+      return config.publicRoutes.includes(path) ? window.dash_clientside.no_update : config.loginRoute;
+    }
+    return path === config.loginRoute ? config.homeRoute : window.dash_clientside.no_update;
+  }
+
+  function trackPath(pathname, lastPath) {
+    // Only hand a pathname to the server page callback when it actually changed.
+    const path = pathname || "/";
+    if (path === lastPath) {
+      throw window.dash_clientside.PreventUpdate;
+    }
+    return path;
+  }
+
+  namespace.routes = { toggleNav, redirect, trackPath };
+})();
@@ -1,8 +1,9 @@
 ﻿from __future__ import annotations
 
+import copy
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 
 import logging
 
@@ -14,6 +15,7 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session as SASession, sessionmaker
 from sqlalchemy.exc import OperationalError
 
+from app.core.cache import TTLCache
 from app.core.settings import Settings, get_settings
 from app.db.models import UserSession
 from app.db.session import get_auth_session_factory
@@ -22,6 +24,11 @@ from app.db.session import get_auth_session_factory
 _MISSING = object()
 
 
+def _as_utc(value: datetime) -> datetime:
+    # Drivers without timezone support hand back naive timestamps; they are stored in UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
 class DatabaseSession(CallbackDict[str, Any], SessionMixin):
     """Session object that tracks modifications for server-side storage."""
 
@@ -63,6 +70,10 @@ class DatabaseSessionInterface(SessionInterface):
         self.session_factory = session_factory or get_auth_session_factory(self.settings)
         self.cookie_name = self.settings.session_cookie_name
         self.lifetime = self.settings.session_lifetime
+        # Session payloads (user, roles, permissions) by token. The cache is per worker, so it never
+        # decides whether a session is still valid: open_session checks is_active/expires_at in the
+        # database on every request and only skips loading the payload.
+        self._records: TTLCache[Dict[str, Any]] = TTLCache(maxsize=1024, ttl=self.settings.session_cache_ttl_seconds)
 
     def _create_session(self, initial: Dict[str, Any] | None = None, sid: str | None = None, new: bool = True) -> DatabaseSession:
         return self.session_class(initial=initial, sid=sid, new=new)
@@ -74,11 +85,22 @@ class DatabaseSessionInterface(SessionInterface):
 
         db: SASession = self.session_factory()
         try:
+            now = datetime.now(timezone.utc)
+            cached = self._records.get(sid)
+            if cached is not None:
+                state_stmt = select(UserSession.is_active, UserSession.expires_at).where(
+                    UserSession.session_token == sid
+                )
+                state = db.execute(state_stmt).one_or_none()
+                if state is not None and state.is_active and _as_utc(state.expires_at) > now:
+                    return self._create_session(initial=copy.deepcopy(cached), sid=sid, new=False)
+                self._records.pop(sid)
+
             stmt = select(UserSession).where(UserSession.session_token == sid)
             record = db.execute(stmt).scalar_one_or_none()
-            now = datetime.now(timezone.utc)
 
-            if not record or not record.is_active or record.expires_at <= now:
+            if not record or not record.is_active or _as_utc(record.expires_at) <= now:
+                self._records.pop(sid)
                 if record:
                     record.is_active = False
                     record.expires_at = now
@@ -86,6 +108,7 @@ class DatabaseSessionInterface(SessionInterface):
                     db.commit()
                 return self._create_session(new=True)
 
+            self._records.set(sid, copy.deepcopy(record.session_data or {}))
             session_obj = self._create_session(initial=record.session_data or {}, sid=sid, new=False)
             session_obj.permanent = True
             session_obj.modified = False
@@ -130,6 +153,8 @@ class DatabaseSessionInterface(SessionInterface):
         client_ip = request.remote_addr if request else None
         user_agent = request.headers.get("User-Agent") if request else None
 
+        self._records.pop(db_session.sid)
+        revoked = False
         db: SASession = self.session_factory()
         try:
             stmt = select(UserSession).where(UserSession.session_token == db_session.sid)
@@ -155,14 +180,19 @@ class DatabaseSessionInterface(SessionInterface):
                         session_data=session_data,
                     )
                     db.add(record)
+                elif not record.is_active or _as_utc(record.expires_at) <= now:
+                    # Logged out or expired since this request's session was opened: drop the cookie
+                    # instead of bringing the record back to life.
+                    revoked = True
                 else:
                     record.session_data = session_data
                     record.expires_at = expires
-                    record.is_active = True
                     record.ip_address = client_ip
                     record.user_agent = user_agent
                     record.user_id = user_id
-                db.commit()
+                if not revoked:
+                    db.commit()
+                    self._records.set(db_session.sid, copy.deepcopy(session_data))
         except OperationalError as exc:
             self.logger.error("Failed to persist session in database: %s", exc)
             response.delete_cookie(
@@ -176,6 +206,11 @@ class DatabaseSessionInterface(SessionInterface):
         finally:
             db.close()
 
+        if revoked:
+            response.delete_cookie(self.cookie_name, path=path, domain=domain, samesite=samesite)
+            db_session.modified = False
+            return
+
         response.set_cookie(
             self.cookie_name,
             db_session.sid,
@@ -190,6 +225,7 @@ class DatabaseSessionInterface(SessionInterface):
         db_session.new = False
 
     def _deactivate_session(self, sid: str) -> None:
+        self._records.pop(sid)
         db: SASession = self.session_factory()
         try:
             stmt = select(UserSession).where(UserSession.session_token == sid)
@@ -201,3 +237,19 @@ class DatabaseSessionInterface(SessionInterface):
                 db.commit()
         finally:
             db.close()
+
+
+class StaticRequestFilteringSessionInterface(SessionInterface):
+    """Serve a null session to static asset requests so they never touch the session store."""
+
+    def __init__(self, inner: SessionInterface, excluded_prefixes: Iterable[str]) -> None:
+        self.inner = inner
+        self.excluded_prefixes = tuple(excluded_prefixes)
+
+    def open_session(self, app, request: Request) -> SessionMixin | None:
+        if request.path.startswith(self.excluded_prefixes):
+            return self.make_null_session(app)
+        return self.inner.open_session(app, request)
+
+    def save_session(self, app, session: SessionMixin, response) -> None:
+        self.inner.save_session(app, session, response)
@@ -27,8 +27,11 @@ class Settings(BaseSettings):
     session_timeout_minutes: int = Field(alias="SESSION_TIMEOUT_MINUTES", default=30)
 
     redis_url: str | None = Field(alias="REDIS_URL", default=None)
+    dwh_cache_ttl_seconds: int = Field(alias="DWH_CACHE_TTL_SECONDS", default=60)
+    session_cache_ttl_seconds: int = Field(alias="SESSION_CACHE_TTL_SECONDS", default=30)
 
     dash_serve_locally: bool = Field(alias="DASH_SERVE_LOCALLY", default=True)
+    gzip_min_size_bytes: int = Field(alias="GZIP_MIN_SIZE_BYTES", default=1024)
 
     @property
     def session_lifetime(self) -> timedelta:
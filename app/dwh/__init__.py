@@ -2,6 +2,8 @@ from .service import (
     DashboardFiltersSnapshot,
     DashboardQueryParams,
     DwhDashboardService,
+    InvalidColumnFilterError,
+    coerce_column_filter,
     set_dwh_dashboard_service,
     get_dwh_dashboard_service,
 )
@@ -33,6 +35,8 @@ __all__ = [
     "DashboardFiltersSnapshot",
     "DashboardQueryParams",
     "DwhDashboardService",
+    "InvalidColumnFilterError",
+    "coerce_column_filter",
     "set_dwh_dashboard_service",
     "get_dwh_dashboard_service",
     "DetailRow",
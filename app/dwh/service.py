@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import logging
+import math
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
-from typing import Any, Iterator
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping, Sequence
 
 from sqlalchemy import bindparam, text
 from sqlalchemy.dialects.postgresql import ARRAY, TEXT
@@ -18,6 +20,67 @@ logger = logging.getLogger(__name__)
 
 _ARRAY_TEXT = ARRAY(TEXT())
 
+# Columns of sales_analysis that the detail table may sort or filter on, with the type comparison values must have.
+DETAIL_COLUMNS: Mapping[str, type] = MappingProxyType(
+    {
+        "sale_date": date,
+        "customer_name": str,
+        "region": str,
+        "customer_segment": str,
+        "category": str,
+        "product_name": str,
+        "quantity": float,
+        "total_amount": float,
+        "profit": float,
+        "sales_channel": str,
+        "payment_method": str,
+    }
+)
+_COMPARISON_OPERATORS = frozenset({"=", "!=", "<", "<=", ">", ">="})
+_PATTERN_OPERATORS = frozenset({"contains", "datestartswith"})
+_LIKE_ESCAPES = str.maketrans({"\\": "\\\\", "%": "\\%", "_": "\\_"})
+DEFAULT_DETAIL_ORDER = "sale_date DESC, sale_id DESC"
+# The dashboard thins the scatter per category, so it fetches more rows than it plots.
+SCATTER_ROW_LIMIT = 10_000
+
+
+class InvalidColumnFilterError(ValueError):
+    """A detail table filter whose value cannot be compared with its column."""
+
+    def __init__(self, column: str, operator: str, value: Any) -> None:
+        super().__init__(f"Invalid filter value for {column} {operator}: {value!r}")
+        self.column = column
+        self.operator = operator
+        self.value = value
+
+
+def coerce_column_filter(column: str, operator: str, value: Any) -> Any:
+    """Return the value to bind for a detail table filter, converted to the column's type.
+
+    Pattern operators match the column's text form, so they take any value as a string.
+    """
+    if operator in _PATTERN_OPERATORS:
+        return str(value)
+    kind = DETAIL_COLUMNS.get(column)
+    if kind is None or operator not in _COMPARISON_OPERATORS or isinstance(value, bool):
+        raise InvalidColumnFilterError(column, operator, value)
+    try:
+        if kind is float:
+            number = float(value)
+            if math.isfinite(number):
+                return number
+        elif kind is date:
+            return value if isinstance(value, date) else date.fromisoformat(str(value).strip())
+        else:
+            return str(value)
+    except (TypeError, ValueError):
+        pass
+    raise InvalidColumnFilterError(column, operator, value)
+
+
+def _escape_like(value: str) -> str:
+    return value.translate(_LIKE_ESCAPES)
+
 
 @dataclass(slots=True)
 class DashboardFiltersSnapshot:
@@ -132,7 +195,7 @@ class DwhDashboardService:
             if row.get("category")
         ]
 
-    def profit_vs_quantity(self, params: DashboardQueryParams, *, limit: int = 1000) -> list[dict[str, Any]]:
+    def profit_vs_quantity(self, params: DashboardQueryParams, *, limit: int = SCATTER_ROW_LIMIT) -> list[dict[str, Any]]:
         sql = (
             f"SELECT sale_id, sale_date, quantity, profit, category, total_amount "
             f"FROM {self.schema}.sales_analysis {{where}} "
@@ -153,14 +216,32 @@ class DwhDashboardService:
             )
         return prepared
 
-    def detailed_sales(self, params: DashboardQueryParams, *, limit: int = 200) -> list[dict[str, Any]]:
+    def detailed_sales(
+        self,
+        params: DashboardQueryParams,
+        *,
+        limit: int = 200,
+        offset: int = 0,
+        order_by: Sequence[tuple[str, bool]] = (),
+        column_filters: Sequence[tuple[str, str, Any]] = (),
+    ) -> list[dict[str, Any]]:
+        """Return one page of sales rows; order_by holds (column, descending) pairs."""
+        order_parts = [
+            f"{column} {'DESC' if descending else 'ASC'}" for column, descending in order_by if column in DETAIL_COLUMNS
+        ]
+        order_clause = ", ".join([*order_parts, DEFAULT_DETAIL_ORDER]) if order_parts else DEFAULT_DETAIL_ORDER
         sql = (
             "SELECT sale_id, sale_date, customer_name, region, customer_segment, "
             "category, product_name, quantity, total_amount, profit, sales_channel, payment_method "
             f"FROM {self.schema}.sales_analysis {{where}} "
-            "ORDER BY sale_date DESC, sale_id DESC LIMIT :limit"
+            f"ORDER BY {order_clause} LIMIT :limit OFFSET :offset"
+        )
+        rows = self._run_query(
+            sql,
+            params,
+            extra_params={"limit": limit, "offset": max(offset, 0)},
+            column_filters=column_filters,
         )
-        rows = self._run_query(sql, params, extra_params={"limit": limit})
         result: list[dict[str, Any]] = []
         for row in rows:
             result.append(
@@ -181,14 +262,25 @@ class DwhDashboardService:
             )
         return result
 
+    def count_sales(
+        self,
+        params: DashboardQueryParams,
+        *,
+        column_filters: Sequence[tuple[str, str, Any]] = (),
+    ) -> int:
+        sql = f"SELECT COUNT(*) AS total FROM {self.schema}.sales_analysis {{where}}"
+        rows = self._run_query(sql, params, column_filters=column_filters)
+        return int(rows[0]["total"]) if rows else 0
+
     def _run_query(
         self,
         sql_template: str,
         params: DashboardQueryParams,
         *,
         extra_params: dict[str, Any] | None = None,
+        column_filters: Sequence[tuple[str, str, Any]] = (),
     ) -> list[dict[str, Any]]:
-        where_clause, bound_params, array_names = self._build_filters(params)
+        where_clause, bound_params, array_names = self._build_filters(params, column_filters)
         if extra_params:
             bound_params.update(extra_params)
         sql = sql_template.format(where=where_clause)
@@ -199,7 +291,11 @@ class DwhDashboardService:
             result = session.execute(stmt, bound_params)
             return [dict(row) for row in result.mappings().all()]
 
-    def _build_filters(self, params: DashboardQueryParams) -> tuple[str, dict[str, Any], list[str]]:
+    def _build_filters(
+        self,
+        params: DashboardQueryParams,
+        column_filters: Sequence[tuple[str, str, Any]] = (),
+    ) -> tuple[str, dict[str, Any], list[str]]:
         conditions: list[str] = []
         bound: dict[str, Any] = {}
         array_names: list[str] = []
@@ -232,18 +328,36 @@ class DwhDashboardService:
             conditions.append("sale_date <= :end_date")
             bound["end_date"] = params.end_date
 
-        if params.quantity_min is not None:
-            conditions.append("quantity >= :quantity_min")
-            bound["quantity_min"] = params.quantity_min
-        if params.quantity_max is not None:
-            conditions.append("quantity <= :quantity_max")
-            bound["quantity_max"] = params.quantity_max
-        if params.profit_min is not None:
-            conditions.append("profit >= :profit_min")
-            bound["profit_min"] = params.profit_min
-        if params.profit_max is not None:
-            conditions.append("profit <= :profit_max")
-            bound["profit_max"] = params.profit_max
+        for column, low, high in (
+            ("quantity", params.quantity_min, params.quantity_max),
+            ("profit", params.profit_min, params.profit_max),
+        ):
+            if low is not None and high is not None:
+                conditions.append(f"{column} BETWEEN :{column}_min AND :{column}_max")
+                bound[f"{column}_min"] = low
+                bound[f"{column}_max"] = high
+            elif low is not None:
+                conditions.append(f"{column} >= :{column}_min")
+                bound[f"{column}_min"] = low
+            elif high is not None:
+                conditions.append(f"{column} <= :{column}_max")
+                bound[f"{column}_max"] = high
+
+        for index, (column, operator, value) in enumerate(column_filters):
+            if column not in DETAIL_COLUMNS:
+                continue
+            name = f"column_filter_{index}"
+            value = coerce_column_filter(column, operator, value)
+            # User input is matched literally: %, _ and the escape character itself are escaped.
+            if operator == "contains":
+                conditions.append(f"CAST({column} AS TEXT) ILIKE :{name} ESCAPE '\\'")
+                bound[name] = f"%{_escape_like(value)}%"
+            elif operator == "datestartswith":
+                conditions.append(f"CAST({column} AS TEXT) LIKE :{name} ESCAPE '\\'")
+                bound[name] = f"{_escape_like(value)}%"
+            else:
+                conditions.append(f"{column} {operator} :{name}")
+                bound[name] = value
 
         where_clause = ""
         if conditions:
@@ -236,43 +236,21 @@ class TopClientActivitiesService:
         period: str,
         departments: Sequence[str] | None = None,
         limit: int = 500,
+        offset: int = 0,
     ) -> list[ClientActivityDetailRow]:
         metric = metric.lower().strip()
         period = period.lower().strip()
-        metric_column = None
-        if metric == "issued":
-            metric_column = self._ISSUED_COLUMNS.get(period)
-        elif metric == "repaid":
-            metric_column = self._REPAID_COLUMNS.get(period)
-        if metric_column is None:
-            raise ValueError(f"Unsupported metric/period combination: {metric}/{period}")
-
-        normalized_category = category.strip()
-        normalized_client = client.strip() if isinstance(client, str) else ""
-        if not normalized_category:
-            return []
-        if client is not None and not normalized_client:
-            return []
-
         with self._session_scope() as session:
-            category_column = self._get_category_column(session)
-            dep_filter, bound = self._build_filters(departments=departments)
-            bound["category"] = normalized_category
-            if normalized_client:
-                bound["client"] = normalized_client
-            bound["metric_threshold"] = 0.0
+            filters = self._detail_filters(
+                session, category=category, client=client, metric=metric, period=period, departments=departments
+            )
+            if filters is None:
+                return []
+            where, bound = filters
             bound["limit"] = max(int(limit), 1)
-            category_expr = self._quote_column(category_column)
-            client_expr = '"Клиент"'
+            bound["offset"] = max(int(offset), 0)
             deal_amount_expr = self._deal_amount_expression(session, metric=metric, period=period)
 
-            conditions: list[str] = [f"{category_expr} = :category", f"COALESCE({metric_column}, 0) > :metric_threshold"]
-            if normalized_client:
-                conditions.append(f"{client_expr} = :client")
-            if dep_filter:
-                conditions.append(dep_filter.replace("WHERE ", "", 1))
-            where = "WHERE " + " AND ".join(conditions)
-
             sql = text(
                 "SELECT\n"
                 "    COALESCE(\"Департамент\", '') AS department,\n"
@@ -287,7 +265,7 @@ class TopClientActivitiesService:
                 f"{where}\n"
                 "GROUP BY department, manager, client, product\n"
                 "ORDER BY deal_amount DESC, client\n"
-                "LIMIT :limit"
+                "LIMIT :limit OFFSET :offset"
             )
             if "departments" in bound:
                 sql = sql.bindparams(bindparam("departments", expanding=True))
@@ -310,6 +288,80 @@ class TopClientActivitiesService:
             )
         return details
 
+    def count_details(
+        self,
+        *,
+        category: str,
+        client: str | None,
+        metric: str,
+        period: str,
+        departments: Sequence[str] | None = None,
+    ) -> int:
+        """Number of detail rows fetch_details would return without a limit."""
+        with self._session_scope() as session:
+            filters = self._detail_filters(
+                session, category=category, client=client, metric=metric, period=period, departments=departments
+            )
+            if filters is None:
+                return 0
+            where, bound = filters
+            sql = text(
+                "SELECT COUNT(*) FROM (\n"
+                "    SELECT 1\n"
+                f"    FROM {self.qualified_table}\n"
+                f"    {where}\n"
+                "    GROUP BY COALESCE(\"Департамент\", ''), COALESCE(\"Менеджер\", ''),\n"
+                "             COALESCE(\"Клиент\", ''), COALESCE(\"Продукт\", '')\n"
+                ") AS details"
+            )
+            if "departments" in bound:
+                sql = sql.bindparams(bindparam("departments", expanding=True))
+            return int(session.execute(sql, bound).scalar() or 0)
+
+    def _detail_filters(
+        self,
+        session: Session,
+        *,
+        category: str,
+        client: str | None,
+        metric: str,
+        period: str,
+        departments: Sequence[str] | None,
+    ) -> tuple[str, dict[str, Any]] | None:
+        """WHERE clause and bound values shared by the detail queries; None when nothing can match."""
+        metric = metric.lower().strip()
+        period = period.lower().strip()
+        metric_column = None
+        if metric == "issued":
+            metric_column = self._ISSUED_COLUMNS.get(period)
+        elif metric == "repaid":
+            metric_column = self._REPAID_COLUMNS.get(period)
+        if metric_column is None:
+            raise ValueError(f"Unsupported metric/period combination: {metric}/{period}")
+
+        normalized_category = category.strip()
+        normalized_client = client.strip() if isinstance(client, str) else ""
+        if not normalized_category:
+            return None
+        if client is not None and not normalized_client:
+            return None
+
+        category_column = self._get_category_column(session)
+        dep_filter, bound = self._build_filters(departments=departments)
+        bound["category"] = normalized_category
+        if normalized_client:
+            bound["client"] = normalized_client
+        bound["metric_threshold"] = 0.0
+        category_expr = self._quote_column(category_column)
+        client_expr = '"Клиент"'
+
+        conditions: list[str] = [f"{category_expr} = :category", f"COALESCE({metric_column}, 0) > :metric_threshold"]
+        if normalized_client:
+            conditions.append(f"{client_expr} = :client")
+        if dep_filter:
+            conditions.append(dep_filter.replace("WHERE ", "", 1))
+        return "WHERE " + " AND ".join(conditions), bound
+
     def _get_category_column(self, session: Session) -> str:
         if self._category_column_name:
             return self._category_column_name
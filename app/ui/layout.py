@@ -45,13 +45,43 @@ DEFAULT_FRAME_STYLE: dict[str, str] = {
     "backdropFilter": "blur(6px)",
 }
 
+# Style dicts are shared by every layout and response; nothing mutates them after import.
+NAV_HIDDEN_STYLE: dict[str, str] = {"display": "none"}
+NAV_ADMIN_HIDDEN_STYLE: dict[str, str] = {"display": "none", "color": NAVBAR_TEXT_COLOR}
+NAV_ITEM_STYLE: dict[str, str] = {"color": NAVBAR_TEXT_COLOR}
+NAV_LINKS_STYLE: dict[str, str] = {"display": "flex", "alignItems": "center", "gap": "0.75rem"}
 
-def get_layout():
+LOGIN_ROUTE = "/login"
+PUBLIC_ROUTES: tuple[str, ...] = ("/", LOGIN_ROUTE)
+
+# Styles and route lists consumed by assets/routes.js when toggling the navbar in the browser.
+NAV_CONFIG: dict[str, object] = {
+    "hidden": NAV_HIDDEN_STYLE,
+    "adminHidden": NAV_ADMIN_HIDDEN_STYLE,
+    "navItem": NAV_ITEM_STYLE,
+    "navLinks": NAV_LINKS_STYLE,
+    "publicRoutes": list(PUBLIC_ROUTES),
+    "loginRoute": LOGIN_ROUTE,
+    "homeRoute": "/library",
+}
+
+ANONYMOUS_PERMISSIONS: dict[str, bool] = {"authenticated": False, "admin": False}
+
+
+def get_layout(
+    permissions: dict[str, bool] | None = None,
+    user_display: list | None = None,
+    identity: str | None = None,
+):
     """Application shell with navbar, routing anchors, and content placeholder."""
     return html.Div(
         [
             dcc.Location(id="url"),
             dcc.Location(id="global-redirect", refresh=True),
+            dcc.Store(id="perms-store", data=permissions or ANONYMOUS_PERMISSIONS),
+            dcc.Store(id="identity-hash", data=identity),
+            dcc.Store(id="last-path"),
+            dcc.Store(id="nav-config", data=NAV_CONFIG),
             dbc.Navbar(
                 dbc.Container(
                     [
@@ -64,7 +94,7 @@ def get_layout():
                                     id="nav-library",
                                     active="exact",
                                     className="navbar-link",
-                                    style={"color": NAVBAR_TEXT_COLOR},
+                                    style=NAV_ITEM_STYLE,
                                 ),
                                 dbc.NavLink(
                                     "Админка",
@@ -72,22 +102,22 @@ def get_layout():
                                     id="nav-admin",
                                     disabled=True,
                                     className="navbar-link",
-                                    style={"display": "none", "color": NAVBAR_TEXT_COLOR},
+                                    style=NAV_ADMIN_HIDDEN_STYLE,
                                 ),
                             ],
                             className="me-auto",
                             pills=True,
                             id="nav-links",
-                            style={"display": "none"},
+                            style=NAV_HIDDEN_STYLE,
                         ),
-                        html.Div(id="navbar-user", className="d-flex align-items-center gap-2"),
+                        html.Div(user_display or [], id="navbar-user", className="d-flex align-items-center gap-2"),
                     ],
                     fluid=True,
                 ),
                 id="main-navbar",
                 dark=True,
                 className="main-navbar mb-4 border-0",
-                style=DEFAULT_NAVBAR_STYLE.copy(),
+                style=DEFAULT_NAVBAR_STYLE,
             ),
             html.Div(
                 dbc.Container(
@@ -96,9 +126,9 @@ def get_layout():
                 ),
                 id="page-frame",
                 className="px-3",
-                style=DEFAULT_FRAME_STYLE.copy(),
+                style=DEFAULT_FRAME_STYLE,
             ),
         ],
         id="app-root",
-        style=DEFAULT_APP_STYLE.copy(),
+        style=DEFAULT_APP_STYLE,
     )
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from dash import html
 import dash_bootstrap_components as dbc
 from dash.development.base_component import Component
 
 
+# These pages are static, so one component tree is built and reused for every response.
+@lru_cache
 def unauthorized_layout() -> Component:
     return dbc.Container(
         [
@@ -25,6 +29,7 @@ def unauthorized_layout() -> Component:
     )
 
 
+@lru_cache(maxsize=64)
 def not_found_layout(pathname: str | None = None) -> Component:
     return dbc.Container(
         [
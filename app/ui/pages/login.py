@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import dash
+from functools import lru_cache
 from typing import cast
 from dash import Input, Output, State, dcc, html
 import dash_bootstrap_components as dbc
@@ -24,6 +25,7 @@ def _default_redirect(profile: AuthProfile) -> str:
     return "/admin" if _can_access_admin(profile) else "/library"
 
 
+@lru_cache
 def layout() -> Component:
     return dbc.Row(
         [
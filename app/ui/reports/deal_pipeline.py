@@ -499,5 +499,6 @@ add_report(
         layout=layout,
         register_callbacks=register_callbacks,
         description="Текущий pipeline сделок в работе с контрольными статусами.",
+        frame_style={"maxWidth": "100%", "width": "100%"},
     )
 )
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, singledispatch
+from operator import attrgetter
 from typing import Any, Iterable
 
 import dash_bootstrap_components as dbc
@@ -9,7 +13,10 @@ from plotly.subplots import make_subplots
 from dash import Input, Output, State, dash_table, dcc, html, ctx, no_update
 from dash.development.base_component import Component
 
+from app.core.cache import TTLCache
+from app.core.settings import get_settings
 from app.dwh import (
+    DetailRow,
     ProductDynamicsService,
     ProductFlows,
     ProductTotals,
@@ -20,8 +27,13 @@ from .registry import ReportEntry, add_report
 
 logger = logging.getLogger(__name__)
 
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="product-dynamics")
+_DETAIL_ROW_FIELDS = attrgetter("department", "manager", "client", "product", "value")
+_DETAIL_CACHE: TTLCache[list[dict[str, Any]]] = TTLCache(maxsize=256, ttl=get_settings().dwh_cache_ttl_seconds)
+
 FIGURE_BG_COLOR = "rgba(0, 0, 0, 0)"
 ALL_DEPARTMENTS_VALUE = "__all__"
+FLOW_CHART_ID_PREFIX = "product-dynamics-flow-chart-"
 TOP_BAR_COLOR = "#644F94"
 FLOW_POSITIVE_COLOR = "#57b26a"
 FLOW_NEGATIVE_COLOR = "#d85756"
@@ -53,6 +65,18 @@ PANEL_STYLE = {
 }
 
 DELTA_DIVIDER_COLOR = "#3E3861"
+# Non-breaking thousands separator keeps the delta numbers on one line.
+DELTA_NUMBER_SEPARATORS = ".\u00a0"
+DELTA_UP_TEXTTEMPLATE = (
+    "<span style='color:#2e7d32; font-weight:600'>▲</span>"
+    "&nbsp;<span style='color:#FFFFFF'>+&nbsp;%{customdata[0]:,.0f}</span>"
+)
+DELTA_DOWN_TEXTTEMPLATE = (
+    "<span style='color:#c62828; font-weight:600'>▼</span>"
+    "&nbsp;<span style='color:#FFFFFF'>-&nbsp;%{customdata[0]:,.0f}</span>"
+)
+DELTA_UP_HOVERTEMPLATE = "%{customdata[1]}: +%{customdata[0]:,.0f} млн руб.<extra></extra>"
+DELTA_DOWN_HOVERTEMPLATE = "%{customdata[1]}: -%{customdata[0]:,.0f} млн руб.<extra></extra>"
 KPI_QUARTER = 4
 KPI_CATEGORY_ORDER = [
     "Привлеченные средства",
@@ -84,12 +108,52 @@ DETAIL_COLUMNS: list[dict[str, Any]] = [
     {"id": "value", "name": "Сумма, млн руб."},
 ]
 
-PERIOD_LABELS = [
+PERIOD_LABELS = (
     ("day", "День"),
     ("week", "Нед."),
     ("quarter", "Кварт."),
     ("year", "Год"),
-]
+)
+PERIOD_CODES = tuple(code for (code, _) in PERIOD_LABELS)
+PERIOD_TEXTS = tuple(label for (_, label) in PERIOD_LABELS)
+PERIOD_COUNT = len(PERIOD_LABELS)
+PERIOD_LABEL_MAP = dict(PERIOD_LABELS)
+THOUSANDS_SEPARATOR_TABLE = str.maketrans(",", " ")
+FLOW_LABEL_FORMAT_SPECS = (",.2f", ",.1f", ",.0f")
+FLOW_BAR_WIDTH = 0.45
+FLOW_X_POSITIONS = tuple(range(PERIOD_COUNT))
+FLOW_XAXIS: dict[str, Any] = {
+    "tickmode": "array",
+    "tickvals": [pos + FLOW_BAR_WIDTH / 2 for pos in FLOW_X_POSITIONS],
+    "ticktext": list(PERIOD_TEXTS),
+    "tickangle": 0,
+    "range": [-0.6, PERIOD_COUNT - 0.2],
+    "tickfont": {"color": "#FFFFFF"},
+    "showgrid": False,
+    "showline": False,
+    "zeroline": False,
+}
+FLOW_YAXIS: dict[str, Any] = {
+    "showticklabels": False,
+    "showgrid": False,
+    "zeroline": False,
+    "visible": False,
+}
+FIGURE_BASE_LAYOUT: dict[str, Any] = {
+    "plot_bgcolor": FIGURE_BG_COLOR,
+    "paper_bgcolor": FIGURE_BG_COLOR,
+    "font": {"family": "Open Sans, Arial, sans-serif"},
+}
+FLOW_LAYOUT: dict[str, Any] = {
+    **FIGURE_BASE_LAYOUT,
+    "barmode": "overlay",
+    "bargap": 0.6,
+    "bargroupgap": 0,
+    "margin": {"l": 20, "r": 30, "t": 20, "b": 30},
+    "xaxis": FLOW_XAXIS,
+    "yaxis": FLOW_YAXIS,
+    "showlegend": False,
+}
 
 
 def _service_or_none() -> ProductDynamicsService | None:
@@ -418,6 +482,7 @@ def layout() -> Component:
                 centered=True,
             ),
             dcc.Store(id="product-dynamics-flow-products", data=[]),
+            dcc.Store(id="product-dynamics-detail-key", data=None),
         ],
         fluid=True,
         className="report-product-dynamics gy-4",
@@ -521,13 +586,17 @@ def register_callbacks(app) -> None:
             return (*[empty] * 4, *titles, [None] * 4)
 
         top_products = [row.product for row in totals[:4]]
-        figures: list[go.Figure] = []
+        figures: list[go.Figure | dict[str, Any]] = []
         titles: list[str] = []
         meta: list[str | None] = []
 
-        for product in top_products:
+        futures = [
+            _EXECUTOR.submit(service.aggregate_product_flows, product=product, departments=departments)
+            for product in top_products
+        ]
+        for product, future in zip(top_products, futures):
             try:
-                flows = service.aggregate_product_flows(product=product, departments=departments)
+                flows = future.result()
             except Exception as exc:  # pragma: no cover - runtime diagnostics only
                 logger.exception("Failed to load flows for %s: %s", product, exc)
                 figures.append(_empty_figure("Ошибка загрузки данных"))
@@ -581,6 +650,7 @@ def register_callbacks(app) -> None:
         Output("product-dynamics-detail-modal", "is_open"),
         Output("product-dynamics-detail-title", "children"),
         Output("product-dynamics-detail-table", "data"),
+        Output("product-dynamics-detail-key", "data"),
         Input("product-dynamics-top-chart", "clickData"),
         Input("product-dynamics-flow-chart-0", "clickData"),
         Input("product-dynamics-flow-chart-1", "clickData"),
@@ -590,6 +660,7 @@ def register_callbacks(app) -> None:
         State("product-dynamics-detail-modal", "is_open"),
         State("product-dynamics-department-filter", "value"),
         State("product-dynamics-flow-products", "data"),
+        State("product-dynamics-detail-key", "data"),
         prevent_initial_call=True,
     )
     def handle_detail_click(
@@ -602,55 +673,52 @@ def register_callbacks(app) -> None:
         is_open,
         department_value,
         flow_products,
+        last_detail_key,
     ):
         trigger = ctx.triggered_id
         if trigger == "product-dynamics-modal-close":
-            return False, no_update, no_update
+            return False, no_update, no_update, no_update
 
         service = _service_or_none()
         if not service:
-            return no_update, no_update, no_update
+            return no_update, no_update, no_update, no_update
         departments = _deserialize_departments(department_value)
 
         if trigger == "product-dynamics-top-chart":
             product = _extract_top_product(top_click)
             if not product:
-                return no_update, no_update, no_update
-            details = _safe_fetch_details(service, "ending_balance", departments, product)
-            if details is None:
-                return no_update, no_update, no_update
+                return no_update, no_update, no_update, no_update
+            detail_key = ["ending_balance", department_value, product]
+            if is_open and detail_key == last_detail_key:
+                return no_update, no_update, no_update, no_update
+            table_rows = _load_detail_table_rows(service, "ending_balance", departments, product)
+            if table_rows is None:
+                return no_update, no_update, no_update, no_update
             title = f"Детализация: Остаток на конец дня — {product}"
-            return True, title, _prepare_detail_rows(details)
-
-        flow_clicks = {
-            "product-dynamics-flow-chart-0": flow_click_0,
-            "product-dynamics-flow-chart-1": flow_click_1,
-            "product-dynamics-flow-chart-2": flow_click_2,
-            "product-dynamics-flow-chart-3": flow_click_3,
-        }
-
-        if trigger in flow_clicks:
-            metric_key, period_label, product = _extract_flow_metric(flow_clicks[trigger])
-            if not product and isinstance(flow_products, list):
-                try:
-                    index = int(trigger.split("-")[-1])
-                except ValueError:
-                    index = -1
-                if 0 <= index < len(flow_products):
-                    candidate = flow_products[index]
-                    product = candidate if isinstance(candidate, str) else product
+            return True, title, table_rows, detail_key
+
+        if isinstance(trigger, str) and trigger.startswith(FLOW_CHART_ID_PREFIX):
+            index = int(trigger[-1])
+            flow_click = (flow_click_0, flow_click_1, flow_click_2, flow_click_3)[index]
+            metric_key, period_label, product = _extract_flow_metric(flow_click)
+            if not product and isinstance(flow_products, list) and index < len(flow_products):
+                candidate = flow_products[index]
+                product = candidate if isinstance(candidate, str) else product
             if not metric_key:
-                return no_update, no_update, no_update
-            details = _safe_fetch_details(service, metric_key, departments, product)
-            if details is None:
-                return no_update, no_update, no_update
+                return no_update, no_update, no_update, no_update
+            detail_key = [metric_key, department_value, product]
+            if is_open and detail_key == last_detail_key:
+                return no_update, no_update, no_update, no_update
+            table_rows = _load_detail_table_rows(service, metric_key, departments, product)
+            if table_rows is None:
+                return no_update, no_update, no_update, no_update
             period_text = period_label or ""
             metric_text = "Выдано" if metric_key.startswith("issued") else "Погашено"
             product_text = product or ""
             title = f"Детализация: {metric_text} - {period_text} - {product_text}".strip(" -")
-            return True, title, _prepare_detail_rows(details)
+            return True, title, table_rows, detail_key
 
-        return no_update, no_update, no_update
+        return no_update, no_update, no_update, no_update
 
 
 def _deserialize_departments(value: str | None) -> list[str] | None:
@@ -894,7 +962,7 @@ def _build_kpi_history_progress(ratio: float | None, color: str) -> html.Div:
     )
 
 
-def _build_combined_totals_figure(totals: Iterable[ProductTotals]) -> go.Figure:
+def _build_combined_totals_figure(totals: Iterable[ProductTotals]) -> go.Figure | dict[str, Any]:
     rows = list(totals)
     if not rows:
         return _empty_figure("Нет данных для отображения")
@@ -937,28 +1005,38 @@ def _build_combined_totals_figure(totals: Iterable[ProductTotals]) -> go.Figure:
         ("Год", "delta_year"),
     ]
 
+    delta_x: list[int] = []
+    delta_y: list[str] = []
+    delta_customdata: list[tuple[float, str]] = []
+    delta_texttemplates: list[str] = []
+    delta_hovertemplates: list[str] = []
     for idx, (label, attr_name) in enumerate(delta_specs):
-        values = [getattr(row, attr_name) for row in rows]
-        texts = [_format_delta_html(value) for value in values]
-        hovers = [
-            f"{label}: {'+' if value >= 0 else '-'}{_format_number(abs(value))} млн руб."
-            for value in values
-        ]
-        fig.add_trace(
-            go.Scatter(
-                x=[idx] * len(products),
-                y=products,
-                mode="text",
-                text=texts,
-                textposition="middle center",
-                textfont=dict(size=16, color="#FFFFFF", family="Open Sans, Arial, sans-serif"),
-                hovertext=hovers,
-                hovertemplate="%{hovertext}<extra></extra>",
-                showlegend=False,
-            ),
-            row=1,
-            col=2,
-        )
+        for row in rows:
+            value = getattr(row, attr_name)
+            is_positive = value >= 0
+            delta_x.append(idx)
+            delta_y.append(row.product)
+            delta_customdata.append((abs(value), label))
+            delta_texttemplates.append(DELTA_UP_TEXTTEMPLATE if is_positive else DELTA_DOWN_TEXTTEMPLATE)
+            delta_hovertemplates.append(DELTA_UP_HOVERTEMPLATE if is_positive else DELTA_DOWN_HOVERTEMPLATE)
+
+    fig.add_trace(
+        go.Scatter(
+            x=delta_x,
+            y=delta_y,
+            mode="text",
+            customdata=delta_customdata,
+            texttemplate=delta_texttemplates,
+            textposition="middle center",
+            textfont=dict(size=16, color="#FFFFFF", family="Open Sans, Arial, sans-serif"),
+            hovertemplate=delta_hovertemplates,
+            showlegend=False,
+        ),
+        row=1,
+        col=2,
+    )
+
+    for idx, (label, _) in enumerate(delta_specs):
         fig.add_annotation(
             x=idx - 0.35,
             y=1.08,
@@ -978,6 +1056,7 @@ def _build_combined_totals_figure(totals: Iterable[ProductTotals]) -> go.Figure:
         paper_bgcolor=FIGURE_BG_COLOR,
         showlegend=False,
         font=dict(family="Open Sans, Arial, sans-serif"),
+        separators=DELTA_NUMBER_SEPARATORS,
     )
     fig.update_xaxes(
         row=1,
@@ -1020,19 +1099,9 @@ def _build_combined_totals_figure(totals: Iterable[ProductTotals]) -> go.Figure:
     return fig
 
 
-def _format_delta_html(value: float) -> str:
-    arrow_color = "#2e7d32" if value >= 0 else "#c62828"
-    arrow = "▲" if value >= 0 else "▼"
-    sign = "+" if value >= 0 else "-"
-    formatted = _format_number(abs(value)).replace(" ", "&nbsp;")
-    return (
-        f"<span style='color:{arrow_color}; font-weight:600'>{arrow}</span>"
-        f"&nbsp;<span style='color:#FFFFFF'>{sign}&nbsp;{formatted}</span>"
-    )
-
-def _build_flow_figure(flows: ProductFlows, product: str) -> go.Figure:
-    periods = [label for (_, label) in PERIOD_LABELS]
-    x_positions = list(range(len(PERIOD_LABELS)))
+def _build_flow_figure(flows: ProductFlows, product: str) -> dict[str, Any]:
+    periods = PERIOD_TEXTS
+    x_positions = FLOW_X_POSITIONS
     issued_values = [
         flows.issued_day,
         flows.issued_week,
@@ -1055,131 +1124,101 @@ def _build_flow_figure(flows: ProductFlows, product: str) -> go.Figure:
         f"{label}: -{_format_number(abs(value))} млн руб."
         for value, label in zip(repaid_values, periods)
     ]
-    width = 0.45
-    label_offset = width / 2
+    width = FLOW_BAR_WIDTH
     issued_customdata = [
-        {"metric": metric, "period": period, "product": product}
-        for metric, (period, _) in zip(
-            ["issued_day", "issued_week", "issued_quarter", "issued_year"], PERIOD_LABELS
+        [metric, period, product]
+        for metric, period in zip(
+            ("issued_day", "issued_week", "issued_quarter", "issued_year"), PERIOD_CODES
         )
     ]
     repaid_customdata = [
-        {"metric": metric, "period": period, "product": product}
-        for metric, (period, _) in zip(
-            ["repaid_day", "repaid_week", "repaid_quarter", "repaid_year"], PERIOD_LABELS
+        [metric, period, product]
+        for metric, period in zip(
+            ("repaid_day", "repaid_week", "repaid_quarter", "repaid_year"), PERIOD_CODES
         )
     ]
 
-    figure = go.Figure(
-        data=[
-            go.Bar(
-                x=x_positions,
-                y=issued_values,
-                name="Выдано",
-                marker=dict(color=FLOW_POSITIVE_COLOR, line=dict(width=0)),
-                customdata=issued_customdata,
-                hovertext=issued_hovers,
-                hovertemplate="%{hovertext}<extra></extra>",
-                offset=-width / 2,
-                width=width,
-                cliponaxis=False,
-                text=issued_texts,
-                textposition="outside",
-                texttemplate="%{text}",
-                textfont=dict(color="#FFFFFF", size=13),
-            ),
-            go.Bar(
-                x=x_positions,
-                y=repaid_values,
-                name="Погашено",
-                marker=dict(color=FLOW_NEGATIVE_COLOR, line=dict(width=0)),
-                customdata=repaid_customdata,
-                hovertext=repaid_hovers,
-                hovertemplate="%{hovertext}<extra></extra>",
-                offset=width / 2,
-                width=width,
-                cliponaxis=False,
-                text=repaid_texts,
-                textposition="outside",
-                texttemplate="%{text}",
-                textfont=dict(color="#FFFFFF", size=13),
-            ),
-        ]
-    )
-
-    figure.update_layout(
-        barmode="overlay",
-        bargap=0.6,
-        bargroupgap=0,
-        plot_bgcolor=FIGURE_BG_COLOR,
-        paper_bgcolor=FIGURE_BG_COLOR,
-        margin=dict(l=20, r=30, t=20, b=30),
-        yaxis=dict(
-            showticklabels=False,
-            showgrid=False,
-            zeroline=False,
-            visible=False,
-        ),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        font=dict(family="Open Sans, Arial, sans-serif"),
-        showlegend=False,
-    )
-    figure.update_xaxes(
-        tickmode="array",
-        tickvals=[pos + label_offset for pos in x_positions],
-        ticktext=periods,
-        tickangle=0,
-   # title="",
-        range=[-0.6, len(PERIOD_LABELS) - 0.2],
-    tickfont=dict(color="#FFFFFF"),
-    showgrid=False,
-    showline=False,
-    zeroline=False,
-    )
-    figure.update_yaxes(visible=False)
-    return figure
+    text_font = {"color": "#FFFFFF", "size": 13}
+    data = [
+        {
+            "type": "bar",
+            "x": x_positions,
+            "y": issued_values,
+            "name": "Выдано",
+            "marker": {"color": FLOW_POSITIVE_COLOR, "line": {"width": 0}},
+            "customdata": issued_customdata,
+            "hovertext": issued_hovers,
+            "hovertemplate": "%{hovertext}<extra></extra>",
+            "offset": -width / 2,
+            "width": width,
+            "cliponaxis": False,
+            "text": issued_texts,
+            "textposition": "outside",
+            "texttemplate": "%{text}",
+            "textfont": text_font,
+        },
+        {
+            "type": "bar",
+            "x": x_positions,
+            "y": repaid_values,
+            "name": "Погашено",
+            "marker": {"color": FLOW_NEGATIVE_COLOR, "line": {"width": 0}},
+            "customdata": repaid_customdata,
+            "hovertext": repaid_hovers,
+            "hovertemplate": "%{hovertext}<extra></extra>",
+            "offset": width / 2,
+            "width": width,
+            "cliponaxis": False,
+            "text": repaid_texts,
+            "textposition": "outside",
+            "texttemplate": "%{text}",
+            "textfont": text_font,
+        },
+    ]
+    return {"data": data, "layout": FLOW_LAYOUT}
 
 
 def _format_number(value: float) -> str:
-    return f"{value:,.0f}".replace(",", " ")
+    return format(value, ",.0f").translate(THOUSANDS_SEPARATOR_TABLE)
 
 
 def _format_flow_label(value: float) -> str:
     scaled = value / 1000.0
     abs_scaled = abs(scaled)
-    if abs_scaled >= 100:
-        formatted = f"{scaled:,.0f}"
-    elif abs_scaled >= 10:
-        formatted = f"{scaled:,.1f}"
-    else:
-        formatted = f"{scaled:,.2f}"
-    return formatted.replace(",", " ")
-
-
-def _empty_figure(message: str) -> go.Figure:
-    figure = go.Figure()
-    figure.update_layout(
-        margin=dict(l=40, r=40, t=40, b=40),
-        plot_bgcolor=FIGURE_BG_COLOR,
-        paper_bgcolor=FIGURE_BG_COLOR,
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        annotations=[
-            dict(
-                text=message,
-                x=0.5,
-                y=0.5,
-                xref="paper",
-                yref="paper",
-                showarrow=False,
-                font=dict(size=16, color="#6c757d", family="Open Sans, Arial, sans-serif"),
-            )
-        ],
-    )
-    return figure
+    spec = FLOW_LABEL_FORMAT_SPECS[(abs_scaled >= 10) + (abs_scaled >= 100)]
+    return format(scaled, spec).translate(THOUSANDS_SEPARATOR_TABLE)
+
+
+@lru_cache(maxsize=16)
+def _empty_figure(message: str) -> dict[str, Any]:
+    return {
+        "data": [],
+        "layout": {
+            **FIGURE_BASE_LAYOUT,
+            "margin": {"l": 40, "r": 40, "t": 40, "b": 40},
+            "xaxis": {"visible": False},
+            "yaxis": {"visible": False},
+            "annotations": [
+                {
+                    "text": message,
+                    "x": 0.5,
+                    "y": 0.5,
+                    "xref": "paper",
+                    "yref": "paper",
+                    "showarrow": False,
+                    "font": {"size": 16, "color": "#6c757d", "family": "Open Sans, Arial, sans-serif"},
+                }
+            ],
+        },
+    }
 
 
 def _ensure_float(value: Any) -> float:
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
+        return float(value)
     try:
         return float(value)
     except (TypeError, ValueError):
@@ -1196,37 +1235,32 @@ def _normalize_product_title(product: Any) -> str:
 
 
 def _extract_top_product(click_data: Any) -> str | None:
-    if not click_data:
-        return None
-    points = click_data.get("points") or []
-    if not points:
+    try:
+        product = click_data["points"][0]["y"]
+    except (TypeError, KeyError, IndexError):
         return None
-    product = points[0].get("y")
     return product if isinstance(product, str) else None
 
 
 def _extract_flow_metric(click_data: Any) -> tuple[str | None, str | None, str | None]:
-    if not click_data:
-        return None, None, None
-    points = click_data.get("points") or []
-    if not points:
+    try:
+        payload = click_data["points"][0]["customdata"]
+    except (TypeError, KeyError, IndexError):
         return None, None, None
-    payload = points[0].get("customdata")
-    if isinstance(payload, dict):
-        metric = payload.get("metric") if isinstance(payload.get("metric"), str) else None
-        period = payload.get("period") if isinstance(payload.get("period"), str) else None
-        product = payload.get("product") if isinstance(payload.get("product"), str) else None
-        return metric, _label_for_period(period), product
+    if isinstance(payload, (list, tuple)) and len(payload) == 3:
+        metric, period, product = payload
+        return (
+            metric if isinstance(metric, str) else None,
+            _label_for_period(period) if isinstance(period, str) else None,
+            product if isinstance(product, str) else None,
+        )
     return None, None, None
 
 
 def _label_for_period(period_code: str | None) -> str | None:
     if not period_code:
         return None
-    for code, label in PERIOD_LABELS:
-        if code == period_code:
-            return label
-    return None
+    return PERIOD_LABEL_MAP.get(period_code)
 
 
 def _safe_fetch_details(
@@ -1238,34 +1272,68 @@ def _safe_fetch_details(
     try:
         return service.fetch_details(metric_key, departments=departments, product=product, limit=500)
     except Exception as exc:  # pragma: no cover - runtime diagnostics only
-        logger.exception("Failed to fetch detail rows for %s: %s", metric_key, exc)
+        logger.error("Failed to fetch detail rows for %s", metric_key, exc_info=exc)
+        return None
+
+
+def _load_detail_table_rows(
+    service: ProductDynamicsService,
+    metric_key: str,
+    departments: list[str] | None,
+    product: str | None,
+) -> list[dict[str, Any]] | None:
+    cache_key = (id(service), metric_key, tuple(sorted(departments)) if departments else None, product)
+    cached = _DETAIL_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    details = _safe_fetch_details(service, metric_key, departments, product)
+    if details is None:
         return None
+    table_rows = _prepare_detail_rows(details)
+    _DETAIL_CACHE.set(cache_key, table_rows)
+    return table_rows
 
 
 def _prepare_detail_rows(rows: Iterable[Any]) -> list[dict[str, Any]]:
-    prepared: list[dict[str, Any]] = []
-    for row in rows:
-        if isinstance(row, dict):
-            prepared.append(
-                {
-                    "department": row.get("department"),
-                    "manager": row.get("manager"),
-                    "client": row.get("client"),
-                    "product": row.get("product"),
-                    "value": _format_number(_ensure_float(row.get("value"))),
-                }
-            )
-        else:
-            prepared.append(
-                {
-                    "department": getattr(row, "department", None),
-                    "manager": getattr(row, "manager", None),
-                    "client": getattr(row, "client", None),
-                    "product": getattr(row, "product", None),
-                    "value": _format_number(_ensure_float(getattr(row, "value", 0.0))),
-                }
-            )
-    return prepared
+    return [_detail_row_to_dict(row) for row in rows]
+
+
+@singledispatch
+def _detail_row_to_dict(row: Any) -> dict[str, Any]:
+    return {
+        "department": _intern_or_none(getattr(row, "department", None)),
+        "manager": _intern_or_none(getattr(row, "manager", None)),
+        "client": getattr(row, "client", None),
+        "product": _intern_or_none(getattr(row, "product", None)),
+        "value": _format_number(_ensure_float(getattr(row, "value", 0.0))),
+    }
+
+
+@_detail_row_to_dict.register(DetailRow)
+def _(row: DetailRow) -> dict[str, Any]:
+    department, manager, client, product, value = _DETAIL_ROW_FIELDS(row)
+    return {
+        "department": _intern_or_none(department),
+        "manager": _intern_or_none(manager),
+        "client": client,
+        "product": _intern_or_none(product),
+        "value": _format_number(_ensure_float(value)),
+    }
+
+
+@_detail_row_to_dict.register(dict)
+def _(row: dict) -> dict[str, Any]:
+    return {
+        "department": _intern_or_none(row.get("department")),
+        "manager": _intern_or_none(row.get("manager")),
+        "client": row.get("client"),
+        "product": _intern_or_none(row.get("product")),
+        "value": _format_number(_ensure_float(row.get("value"))),
+    }
+
+
+def _intern_or_none(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
 
 
 add_report(
@@ -2,20 +2,43 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import pickle
+import re
+import tempfile
+from collections import ChainMap
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, NamedTuple
 
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-from dash import Dash, Input, Output, State, dcc, html, no_update
+from dash import Dash, Input, Output, Patch, State, ctx, dcc, html, no_update
 from dash.development.base_component import Component
 from plotly.colors import sample_colorscale
 
+from app.core.cache import TTLCache
+from app.core.settings import get_settings
 from app.dwh import ProductDynamicsService, get_product_dynamics_service
 from .registry import ReportEntry, add_report
 
 logger = logging.getLogger(__name__)
 
+
+class NormalizedTotals(NamedTuple):
+    rows: list[dict[str, Any]]
+    raw_codes: dict[str, str]
+    names: dict[str, str]
+
+
+_QUERY_CACHE: TTLCache[Any] = TTLCache(maxsize=256, ttl=get_settings().dwh_cache_ttl_seconds)
+_MAP_FIGURE_CACHE: TTLCache[tuple[list[dict[str, Any]], dict[str, Any]]] = TTLCache(
+    maxsize=32, ttl=get_settings().dwh_cache_ttl_seconds
+)
+_TOTALS_CACHE: TTLCache[tuple[list[dict[str, Any]], NormalizedTotals]] = TTLCache(
+    maxsize=32, ttl=get_settings().dwh_cache_ttl_seconds
+)
+
 FIGURE_BG_COLOR = "rgba(0, 0, 0, 0)"
 DEFAULT_FONT_FAMILY = "Open Sans, Arial, sans-serif"
 FILTER_CARD_STYLE = {
@@ -42,11 +65,16 @@ COLOR_SCALE = [
 BASE_REGION_COLOR = "rgba(213, 217, 224, 0.35)"
 REGION_BORDER_COLOR = "rgba(255, 255, 255, 0.35)"
 REGION_SELECTED_BORDER_COLOR = "rgb(255, 237, 0)"
+REGION_SELECTED_FILL_COLOR = "rgba(255, 255, 255, 0.25)"
 HOVER_TEMPLATE = (
-    "Название региона: %{customdata[0]}<br>"
-    "Объём сделок: %{customdata[1]} млн руб.<extra></extra>"
+    "Название региона: {label}<br>"
+    "Объём сделок: {value} млн руб.<extra></extra>"
 )
 MAP_CARD_MIN_HEIGHT = 560
+MAP_DATA_DIR = Path(__file__).resolve().parents[3] / "static" / "map"
+MAP_CACHE_VERSION = 3
+SIMPLIFY_TOLERANCE = 1.0
+COORDINATE_PRECISION = 2
 
 
 def _normalize_region_code(value: Any) -> str | None:
@@ -60,23 +88,22 @@ def _normalize_region_code(value: Any) -> str | None:
             if value.is_integer():
                 value = int(value)
         return str(value).strip()
-    text = str(value).strip()
+    return _normalize_region_text(str(value))
+
+
+# Integer-like codes with optional leading zeros and a zero fraction, e.g. "077" or "77,0".
+_INTEGER_CODE_RE = re.compile(r"^(?=[.,]?\d)0*(\d*?)(?:[.,]0*)?$")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_region_text(value: str) -> str | None:
+    text = value.strip()
     if not text:
         return None
-    normalized = text.replace(",", ".")
-    # Handle float-like codes such as "77.0"
-    if normalized.replace(".", "", 1).isdigit():
-        try:
-            numeric = float(normalized)
-        except ValueError:
-            pass
-        else:
-            if numeric.is_integer():
-                return str(int(numeric))
-    if normalized.isdigit():
-        stripped = normalized.lstrip("0")
-        return stripped or "0"
-    return normalized
+    match = _INTEGER_CODE_RE.match(text)
+    if match:
+        return match.group(1) or "0"
+    return text.replace(",", ".")
 
 
 def _extract_region_code(point: dict[str, Any]) -> str | None:
@@ -91,6 +118,8 @@ def _extract_region_code(point: dict[str, Any]) -> str | None:
             candidate = candidate[0]
         if isinstance(candidate, (list, tuple)) and candidate:
             candidate = candidate[-1]
+    elif isinstance(customdata, (str, int, float)):
+        candidate = customdata
     elif isinstance(customdata, dict):
         for key in ("code", "region_code", "id", "value"):
             if key in customdata:
@@ -101,6 +130,17 @@ def _extract_region_code(point: dict[str, Any]) -> str | None:
     return _normalize_region_code(candidate)
 
 
+def _cached_query(method: Callable[..., Any], **kwargs: Any) -> Any:
+    """Run a read-only service query, reusing the result for identical arguments within the TTL."""
+    key = (method, tuple(sorted(kwargs.items())))
+    cached = _QUERY_CACHE.get(key)
+    if cached is not None:
+        return cached
+    result = method(**kwargs)
+    _QUERY_CACHE.set(key, result)
+    return result
+
+
 def _service_or_none() -> ProductDynamicsService | None:
     try:
         return get_product_dynamics_service()
@@ -109,8 +149,87 @@ def _service_or_none() -> ProductDynamicsService | None:
         return None
 
 
+def _simplify_ring(points: list[tuple[float, float]], tolerance: float) -> list[tuple[float, float]]:
+    """Reduce ring vertices with Ramer–Douglas–Peucker and round coordinates."""
+    if tolerance > 0 and len(points) > 4:
+        keep = [False] * len(points)
+        keep[0] = keep[-1] = True
+        stack = [(0, len(points) - 1)]
+        while stack:
+            start, end = stack.pop()
+            x1, y1 = points[start]
+            x2, y2 = points[end]
+            dx = x2 - x1
+            dy = y2 - y1
+            length = (dx * dx + dy * dy) ** 0.5
+            max_distance = -1.0
+            index = start
+            for position in range(start + 1, end):
+                px, py = points[position]
+                if length:
+                    distance = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / length
+                else:
+                    distance = ((px - x1) ** 2 + (py - y1) ** 2) ** 0.5
+                if distance > max_distance:
+                    max_distance = distance
+                    index = position
+            if max_distance > tolerance:
+                keep[index] = True
+                stack.append((start, index))
+                stack.append((index, end))
+        simplified = [point for point, kept in zip(points, keep) if kept]
+        if len(simplified) >= 3:
+            points = simplified
+    return [(round(x, COORDINATE_PRECISION), round(y, COORDINATE_PRECISION)) for x, y in points]
+
+
 def _load_region_geometries() -> dict[str, Any]:
-    path = Path(__file__).resolve().parents[3] / "static" / "map" / "russia_map.json"
+    path = MAP_DATA_DIR / "russia_map.json"
+    cache_path = path.with_suffix(".pkl")
+    cached = _read_map_cache(path, cache_path)
+    if cached is not None:
+        return cached
+    geometries = _parse_region_geometries(path)
+    if geometries:
+        _write_map_cache(cache_path, geometries)
+    return geometries
+
+
+def _read_map_cache(source: Path, cache_path: Path) -> dict[str, Any] | None:
+    try:
+        if cache_path.stat().st_mtime < source.stat().st_mtime:
+            return None
+        with cache_path.open("rb") as handle:
+            payload = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pragma: no cover - runtime diagnostics only
+        logger.warning("Ignoring unreadable map cache %s: %s", cache_path, exc)
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != MAP_CACHE_VERSION:
+        return None
+    data = payload.get("data")
+    return data if isinstance(data, dict) else None
+
+
+def _write_map_cache(cache_path: Path, data: dict[str, Any]) -> None:
+    payload = {"version": MAP_CACHE_VERSION, "data": data}
+    # Write beside the target and swap it in, so concurrent workers never read a partial pickle.
+    tmp_path: Path | None = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=cache_path.parent, prefix=f".{cache_path.name}.", delete=False
+        ) as handle:
+            tmp_path = Path(handle.name)
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        logger.warning("Could not write map cache %s: %s", cache_path, exc)
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+
+
+def _parse_region_geometries(path: Path) -> dict[str, Any]:
     try:
         data = json.loads(path.read_text(encoding="utf-8"))
     except FileNotFoundError:
@@ -153,24 +272,23 @@ def _load_region_geometries() -> dict[str, Any]:
         for ring in polygons:
             if not isinstance(ring, list):
                 continue
-            points: list[tuple[float, float]] = []
-            for coord in ring:
-                if (
-                    not isinstance(coord, (list, tuple))
-                    or len(coord) < 2
-                    or coord[0] is None
-                    or coord[1] is None
-                ):
-                    continue
-                x = float(coord[0])
-                y = float(coord[1])
-                points.append((x, y))
-                min_x = min(min_x, x)
-                max_x = max(max_x, x)
-                min_y = min(min_y, y)
-                max_y = max(max_y, y)
+            points: list[tuple[float, float]] = [
+                (float(coord[0]), float(coord[1]))
+                for coord in ring
+                if isinstance(coord, (list, tuple))
+                and len(coord) >= 2
+                and coord[0] is not None
+                and coord[1] is not None
+            ]
+            if not points:
+                continue
+            ring_xs, ring_ys = zip(*points)
+            min_x = min(min_x, min(ring_xs))
+            max_x = max(max_x, max(ring_xs))
+            min_y = min(min_y, min(ring_ys))
+            max_y = max(max_y, max(ring_ys))
             if len(points) >= 3:
-                processed.append(points)
+                processed.append(_simplify_ring(points, SIMPLIFY_TOLERANCE))
 
         if not processed:
             continue
@@ -207,13 +325,109 @@ MAP_Y_RANGE = (
     float(META.get("y_min", 0.0)),
     float(META.get("y_max", 1.0)),
 )
+MAP_HOVER_LABEL = {"bgcolor": "#1f1846", "font": {"color": "#FFFFFF", "family": DEFAULT_FONT_FAMILY}}
+MAP_COLORBAR = {
+    "title": {
+        "text": "млн руб.",
+        "side": "top",
+        "font": {"color": "#FFFFFF", "family": DEFAULT_FONT_FAMILY},
+    },
+    "orientation": "h",
+    "outlinecolor": "rgba(0,0,0,0)",
+    "thickness": 14,
+    "tickfont": {"color": "#FFFFFF", "family": DEFAULT_FONT_FAMILY},
+    "ticksuffix": "",
+    "len": 0.45,
+    "x": 0.5,
+    "xanchor": "center",
+    "y": -0.18,
+    "yanchor": "bottom",
+}
+COLORBAR_ANCHOR_TRACE = {
+    "type": "scatter",
+    "x": [None],
+    "y": [None],
+    "mode": "markers",
+    "marker": {"color": [0], "coloraxis": "coloraxis"},
+    "hoverinfo": "skip",
+    "showlegend": False,
+}
+MAP_BASE_LAYOUT = {
+    "title": {"text": "", "font": {"family": DEFAULT_FONT_FAMILY, "size": 18, "color": "#FFFFFF"}},
+    "font": {"family": DEFAULT_FONT_FAMILY, "color": "#FFFFFF"},
+    "margin": {"l": 20, "r": 20, "t": 60, "b": 80},
+    "plot_bgcolor": FIGURE_BG_COLOR,
+    "paper_bgcolor": FIGURE_BG_COLOR,
+    "dragmode": False,
+    "height": MAP_CARD_MIN_HEIGHT,
+    "xaxis": {"visible": False, "range": list(MAP_X_RANGE), "fixedrange": True},
+    "yaxis": {
+        "visible": False,
+        "range": list(MAP_Y_RANGE),
+        "scaleanchor": "x",
+        "scaleratio": 1,
+        "fixedrange": True,
+    },
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RegionShape:
+    """Flattened ring coordinates of one region, rings separated by None, with per-vertex codes."""
+
+    code: str
+    xs: tuple[float | None, ...]
+    ys: tuple[float | None, ...]
+    codes: tuple[str, ...]
+    path: str
+
+
+def _build_region_shapes(geometries: dict[str, Any]) -> tuple[RegionShape, ...]:
+    shapes: list[RegionShape] = []
+    for code_key, geometry in geometries.items():
+        if code_key == "_meta":
+            continue
+        xs: list[float | None] = []
+        ys: list[float | None] = []
+        path_parts: list[str] = []
+        for polygon in geometry.get("polygons") or []:
+            if not isinstance(polygon, list) or len(polygon) < 3:
+                continue
+            if xs:
+                xs.append(None)
+                ys.append(None)
+            xs.extend(point[0] for point in polygon)
+            ys.extend(point[1] for point in polygon)
+            path_parts.append("M" + "L".join(f"{x},{y}" for x, y in polygon) + "Z")
+        if xs:
+            code = _normalize_region_code(code_key) or str(code_key)
+            shapes.append(
+                RegionShape(
+                    code=code,
+                    xs=tuple(xs),
+                    ys=tuple(ys),
+                    codes=(code,) * len(xs),
+                    path="".join(path_parts),
+                )
+            )
+    return tuple(shapes)
+
+
+REGION_SHAPES = _build_region_shapes(REGION_GEOMETRIES)
+REGION_CODES = frozenset(shape.code for shape in REGION_SHAPES)
+REGION_PATHS = {shape.code: shape.path for shape in REGION_SHAPES}
 
 
 def _load_region_names() -> dict[str, str]:
     """Load official region names from the pre-generated dataset."""
-    source = Path(__file__).resolve().parents[3] / "static" / "map" / "russia_regions.json"
+    source = MAP_DATA_DIR / "russia_regions.json"
+    cache_path = source.with_suffix(".pkl")
+    cached = _read_map_cache(source, cache_path)
+    if cached is not None:
+        return cached
     try:
-        raw = json.loads(source.read_text(encoding="utf-8"))
+        with source.open("rb") as handle:
+            raw = json.load(handle)
     except (FileNotFoundError, json.JSONDecodeError):
         logger.warning("Fallback region names file %s is unavailable or invalid", source)
         return {}
@@ -223,6 +437,8 @@ def _load_region_names() -> dict[str, str]:
         label = item.get("name")
         if code and isinstance(label, str) and label.strip():
             names[code] = label.strip()
+    if names:
+        _write_map_cache(cache_path, names)
     return names
 
 
@@ -234,10 +450,11 @@ def layout() -> Component:
     product_options: list[dict[str, str]] = []
     dropdown_value = ALL_PRODUCTS_VALUE
     figure = _empty_map_figure("Источник данных недоступен")
+    geometry_ready = False
 
     if service:
         try:
-            products = service.list_products()
+            products = _cached_query(service.list_products)
         except Exception as exc:  # pragma: no cover - runtime diagnostics only
             logger.exception("Failed to fetch product list: %s", exc)
             products = []
@@ -247,11 +464,12 @@ def layout() -> Component:
             if isinstance(product, str) and product.strip()
         ]
         try:
-            totals = service.aggregate_region_totals()
+            totals = _cached_query(service.aggregate_region_totals)
         except Exception as exc:  # pragma: no cover - runtime diagnostics only
             logger.exception("Failed to fetch initial region totals: %s", exc)
         else:
-            figure = _build_map_figure(totals)
+            figure = _cached_map_figure(totals, _normalized_totals(totals).rows, None)
+            geometry_ready = bool(REGION_SHAPES)
     else:
         product_options = [{"label": "Все продукты", "value": ALL_PRODUCTS_VALUE}]
 
@@ -274,6 +492,7 @@ def layout() -> Component:
     return dbc.Container(
         [
             dcc.Store(id="regional-selected-region"),
+            dcc.Store(id="regional-map-geometry-ready", data=geometry_ready),
             html.Div(
                 html.H3(
                     "Продуктовая аналитика в региональном разрезе",
@@ -429,48 +648,35 @@ def register_callbacks(app: Dash) -> None:
         Output("regional-product-map", "figure"),
         Output("regional-product-summary", "children"),
         Output("regional-top-deals", "children"),
+        Output("regional-map-geometry-ready", "data"),
         Input("regional-product-filter", "value"),
         Input("regional-selected-region", "data"),
+        State("regional-map-geometry-ready", "data"),
     )
-    def update_dashboard(selected_value: str | None, selected_region: str | None):
+    def update_dashboard(selected_value: str | None, selected_region: str | None, geometry_ready: bool | None):
         service = _service_or_none()
         if not service:
             placeholder = _placeholder_message("Источник данных недоступен")
-            return _empty_map_figure("Источник данных недоступен"), placeholder, placeholder
+            return _empty_map_figure("Источник данных недоступен"), placeholder, placeholder, False
 
         product = None if not selected_value or selected_value == ALL_PRODUCTS_VALUE else selected_value
         selected_code = _normalize_region_code(selected_region) if isinstance(selected_region, str) else None
 
         try:
-            totals_raw = service.aggregate_region_totals(product=product)
-            region_name_lookup: dict[str, str] = REGION_NAME_FALLBACKS.copy()
-            raw_code_lookup: dict[str, str] = {}
-            normalized_totals: list[dict[str, Any]] = []
-            for row in totals_raw:
-                raw_code = row.get("code")
-                normalized_code = _normalize_region_code(raw_code)
-                if not normalized_code:
-                    continue
-                if raw_code is not None:
-                    raw_str = str(raw_code).strip()
-                    if raw_str:
-                        raw_code_lookup.setdefault(normalized_code, raw_str)
-                name = row.get("name")
-                if isinstance(name, str) and name.strip():
-                    region_name_lookup[normalized_code] = name.strip()
-                normalized_row = dict(row)
-                normalized_row["code"] = normalized_code
-                normalized_totals.append(normalized_row)
-            totals = normalized_totals
+            totals_raw = _cached_query(service.aggregate_region_totals, product=product)
+            totals, raw_code_lookup, region_names = _normalized_totals(totals_raw)
             region_code = raw_code_lookup.get(selected_code) if selected_code else None
+            region_name_lookup = ChainMap(region_names, REGION_NAME_FALLBACKS)
             region_filter_name = region_name_lookup.get(selected_code) if selected_code else None
             region_label = region_filter_name or (f"Код {selected_code}" if selected_code else None)
-            product_totals = service.aggregate_product_amounts(
+            product_totals = _cached_query(
+                service.aggregate_product_amounts,
                 product=product,
                 region_code=region_code,
                 region_name=region_filter_name,
             )
-            top_deals = service.top_deals(
+            top_deals = _cached_query(
+                service.top_deals,
                 product=product,
                 region_code=region_code,
                 region_name=region_filter_name,
@@ -479,16 +685,123 @@ def register_callbacks(app: Dash) -> None:
         except Exception as exc:  # pragma: no cover - runtime diagnostics only
             logger.exception("Failed to update regional analytics for %s: %s", product or "all products", exc)
             placeholder = _placeholder_message("Не удалось загрузить данные")
-            return _empty_map_figure("Не удалось загрузить данные"), placeholder, placeholder
+            return _empty_map_figure("Не удалось загрузить данные"), placeholder, placeholder, False
+
+        # Geometry is shipped once; later updates only restyle the traces already on the client.
+        if not geometry_ready or not REGION_SHAPES:
+            figure = _cached_map_figure(totals_raw, totals, selected_code)
+        elif not ctx.triggered_id:
+            # layout() already rendered the unfiltered map for the initial call.
+            figure = no_update
+        elif "regional-product-filter.value" in ctx.triggered_prop_ids:
+            figure = _patch_map_figure(totals, selected_code)
+        else:
+            figure = Patch()
+            figure["layout"]["shapes"] = _selection_shapes(selected_code)
+        return (
+            figure,
+            _build_product_summary(product_totals, region_label),
+            _build_top_deals(top_deals, region_label),
+            bool(REGION_SHAPES),
+        )
 
-        figure = _build_map_figure(totals, selected_region=selected_code)
-        return figure, _build_product_summary(product_totals, region_label), _build_top_deals(top_deals, region_label)
 
+def _normalized_totals(source_rows: list[dict[str, Any]]) -> NormalizedTotals:
+    """Normalize region totals once per query result; region clicks reuse the same rows."""
+    key = id(source_rows)
+    cached = _TOTALS_CACHE.get(key)
+    if cached is not None and cached[0] is source_rows:
+        return cached[1]
 
-def _build_map_figure(rows: list[dict[str, Any]], selected_region: str | None = None) -> go.Figure:
-    if not REGION_GEOMETRIES or len(REGION_GEOMETRIES) <= 1:
+    region_names: dict[str, str] = {}
+    raw_code_lookup: dict[str, str] = {}
+    totals: list[dict[str, Any]] = []
+    for row in source_rows:
+        raw_code = row.get("code")
+        normalized_code = _normalize_region_code(raw_code)
+        if not normalized_code:
+            continue
+        if raw_code is not None:
+            raw_str = str(raw_code).strip()
+            if raw_str:
+                raw_code_lookup.setdefault(normalized_code, raw_str)
+        name = row.get("name")
+        if isinstance(name, str) and name.strip():
+            region_names[normalized_code] = name.strip()
+        normalized_row = dict(row)
+        normalized_row["code"] = normalized_code
+        totals.append(normalized_row)
+
+    result = NormalizedTotals(totals, raw_code_lookup, region_names)
+    _TOTALS_CACHE.set(key, (source_rows, result))
+    return result
+
+
+def _cached_map_figure(
+    source_rows: list[dict[str, Any]],
+    rows: list[dict[str, Any]],
+    selected_region: str | None,
+) -> dict[str, Any]:
+    """Reuse the serialisable map figure while the underlying query result is unchanged."""
+    key = (id(source_rows), selected_region)
+    cached = _MAP_FIGURE_CACHE.get(key)
+    if cached is not None and cached[0] is source_rows:
+        return cached[1]
+    figure = _build_map_figure(rows, selected_region=selected_region)
+    _MAP_FIGURE_CACHE.set(key, (source_rows, figure))
+    return figure
+
+
+def _build_map_figure(rows: list[dict[str, Any]], selected_region: str | None = None) -> dict[str, Any]:
+    if not REGION_SHAPES:
         return _empty_map_figure("Не найдено данных по карте России")
 
+    fill_colors, hover_templates, max_value = _map_region_styles(rows)
+    data: list[dict[str, Any]] = [
+        {
+            "type": "scatter",
+            "x": shape.xs,
+            "y": shape.ys,
+            "mode": "lines",
+            "fill": "toself",
+            "line": {"color": REGION_BORDER_COLOR, "width": 0.8},
+            "fillcolor": fill_color,
+            "hovertemplate": hover_template,
+            "customdata": shape.codes,
+            "name": "",
+            "hoverlabel": MAP_HOVER_LABEL,
+            "showlegend": False,
+        }
+        for shape, fill_color, hover_template in zip(REGION_SHAPES, fill_colors, hover_templates)
+    ]
+    # A point-less marker trace binds the layout coloraxis so its colorbar is drawn.
+    data.append(COLORBAR_ANCHOR_TRACE)
+
+    layout: dict[str, Any] = {
+        **MAP_BASE_LAYOUT,
+        "shapes": _selection_shapes(selected_region),
+        "annotations": _map_annotations(max_value),
+        "coloraxis": _map_coloraxis(max_value),
+    }
+    return {"data": data, "layout": layout}
+
+
+def _patch_map_figure(rows: list[dict[str, Any]], selected_region: str | None = None) -> Patch:
+    """Recolour a map already rendered by _build_map_figure without resending its geometry."""
+    fill_colors, hover_templates, max_value = _map_region_styles(rows)
+    figure = Patch()
+    for index, (fill_color, hover_template) in enumerate(zip(fill_colors, hover_templates)):
+        figure["data"][index]["fillcolor"] = fill_color
+        figure["data"][index]["hovertemplate"] = hover_template
+    figure["layout"]["coloraxis"]["cmax"] = max(max_value, 0.0)
+    figure["layout"]["coloraxis"]["showscale"] = max_value > 0
+    figure["layout"]["annotations"] = _map_annotations(max_value)
+    figure["layout"]["shapes"] = _selection_shapes(selected_region)
+    return figure
+
+
+def _map_region_styles(rows: list[dict[str, Any]]) -> tuple[list[str], list[str], float]:
+    """Fill colours and hover templates per REGION_SHAPES entry, plus the maximum amount."""
     values_by_code: dict[str, float] = {}
     labels_by_code: dict[str, str] = {}
     for row in rows:
@@ -504,116 +817,41 @@ def _build_map_figure(rows: list[dict[str, Any]], selected_region: str | None =
         if isinstance(label, str) and label.strip():
             labels_by_code[normalized_code] = label.strip()
 
-    available_codes = {
-        _normalize_region_code(code) or str(code)
-        for code in REGION_GEOMETRIES
-        if code != "_meta"
-    }
-    missing_codes = sorted(set(values_by_code) - available_codes)
+    missing_codes = sorted(set(values_by_code) - REGION_CODES)
     if missing_codes:
         logger.warning("No geometry found for region codes: %s", ", ".join(missing_codes))
 
     max_value = max(values_by_code.values(), default=0.0)
 
-    fig = go.Figure()
-
-    font_config = {"family": DEFAULT_FONT_FAMILY, "color": "#FFFFFF"}
-    for code_key, geometry in REGION_GEOMETRIES.items():
-        if code_key == "_meta":
-            continue
-        geometry_code = _normalize_region_code(code_key) or str(code_key)
-        polygons = geometry.get("polygons") or []
+    fill_colors: list[str] = []
+    hover_templates: list[str] = []
+    for shape in REGION_SHAPES:
+        geometry_code = shape.code
         region_value = values_by_code.get(geometry_code, 0.0)
-        color = _color_for_value(region_value, max_value)
-        formatted_value = _format_amount(region_value)
         display_label = (
             labels_by_code.get(geometry_code)
             or REGION_NAME_FALLBACKS.get(geometry_code)
             or f"Код {geometry_code}"
         )
-        is_selected = bool(selected_region and geometry_code and selected_region == geometry_code)
-        border_color = REGION_SELECTED_BORDER_COLOR if is_selected else REGION_BORDER_COLOR
-        border_width = 3.0 if is_selected else 0.8
-        for polygon in polygons:
-            if not isinstance(polygon, list) or len(polygon) < 3:
-                continue
-            xs = [point[0] for point in polygon]
-            ys = [point[1] for point in polygon]
-            customdata = [[display_label, formatted_value, geometry_code]] * len(xs)
-            fig.add_trace(
-                go.Scatter(
-                    x=xs,
-                    y=ys,
-                    mode="lines",
-                    fill="toself",
-                    line={"color": border_color, "width": border_width},
-                    fillcolor=_selected_fill_color(color) if is_selected else color,
-                    hovertemplate=HOVER_TEMPLATE,
-                    customdata=customdata,
-                    name="",
-                    hoverlabel={"bgcolor": "#1f1846", "font": {"color": "#FFFFFF", "family": DEFAULT_FONT_FAMILY}},
-                    showlegend=False,
-                )
-            )
-
-    if max_value > 0:
-        fig.add_trace(
-            go.Heatmap(
-                x=[0, 1],
-                y=[0, 1],
-                z=[[0, max_value], [0, max_value]],
-                colorscale=COLOR_SCALE,
-                showscale=True,
-                colorbar={
-                    "title": {
-                        "text": "млн руб.",
-                        "side": "top",
-                        "font": {"color": "#FFFFFF", "family": DEFAULT_FONT_FAMILY},
-                    },
-                    "orientation": "h",
-                    "outlinecolor": "rgba(0,0,0,0)",
-                    "thickness": 14,
-                    "tickfont": {"color": "#FFFFFF", "family": DEFAULT_FONT_FAMILY},
-                    "ticksuffix": "",
-                    "len": 0.45,
-                    "x": 0.5,
-                    "xanchor": "center",
-                    "y": -0.18,
-                    "yanchor": "bottom",
-                },
-                opacity=0,
-                hoverinfo="skip",
-                showlegend=False,
-            )
-        )
-
-    fig.update_layout(
-        title="",
-        title_font={"family": DEFAULT_FONT_FAMILY, "size": 18, "color": "#FFFFFF"},
-        font=font_config,
-        margin={"l": 20, "r": 20, "t": 60, "b": 80},
-        plot_bgcolor=FIGURE_BG_COLOR,
-        paper_bgcolor=FIGURE_BG_COLOR,
-        dragmode=False,
-        height=MAP_CARD_MIN_HEIGHT,
-    )
-    fig.update_xaxes(visible=False, range=list(MAP_X_RANGE), fixedrange=True)
-    fig.update_yaxes(
-        visible=False,
-        range=list(MAP_Y_RANGE),
-        scaleanchor="x",
-        scaleratio=1,
-        fixedrange=True,
-    )
+        fill_colors.append(_color_for_value(region_value, max_value))
+        hover_templates.append(HOVER_TEMPLATE.format(label=display_label, value=_format_amount(region_value)))
+    return fill_colors, hover_templates, max_value
+
+
+def _map_coloraxis(max_value: float) -> dict[str, Any]:
+    return {
+        "colorscale": COLOR_SCALE,
+        "cmin": 0,
+        "cmax": max(max_value, 0.0),
+        "showscale": max_value > 0,
+        "colorbar": MAP_COLORBAR,
+    }
 
-    if max_value <= 0:
-        fig.add_annotation(
-            text="Нет данных для выбранного фильтра",
-            showarrow=False,
-            font={"color": "#FFFFFF", "size": 14, "family": DEFAULT_FONT_FAMILY},
-        )
 
-    return fig
+def _map_annotations(max_value: float) -> list[dict[str, Any]]:
+    if max_value > 0:
+        return []
+    return [_map_message_annotation("Нет данных для выбранного фильтра")]
 
 
 def _build_product_summary(rows: list[dict[str, Any]], region_label: str | None = None) -> Component:
@@ -668,66 +906,81 @@ def _placeholder_message(text: str) -> Component:
     return html.Div(text, className="text-muted small")
 
 
-def _empty_map_figure(message: str) -> go.Figure:
-    fig = go.Figure()
-    fig.add_annotation(
-        text=message,
-        showarrow=False,
-        font={"color": "#FFFFFF", "size": 14, "family": DEFAULT_FONT_FAMILY},
-    )
-    fig.update_layout(
-        plot_bgcolor=FIGURE_BG_COLOR,
-        paper_bgcolor=FIGURE_BG_COLOR,
-        margin={"l": 20, "r": 20, "t": 60, "b": 20},
-        font={"family": DEFAULT_FONT_FAMILY, "color": "#FFFFFF"},
-        height=MAP_CARD_MIN_HEIGHT,
-    )
-    fig.update_xaxes(visible=False)
-    fig.update_yaxes(visible=False)
-    return fig
+def _empty_map_figure(message: str) -> dict[str, Any]:
+    return {
+        "data": [],
+        "layout": {
+            "plot_bgcolor": FIGURE_BG_COLOR,
+            "paper_bgcolor": FIGURE_BG_COLOR,
+            "margin": {"l": 20, "r": 20, "t": 60, "b": 20},
+            "font": {"family": DEFAULT_FONT_FAMILY, "color": "#FFFFFF"},
+            "height": MAP_CARD_MIN_HEIGHT,
+            "xaxis": {"visible": False},
+            "yaxis": {"visible": False},
+            "annotations": [_map_message_annotation(message)],
+        },
+    }
+
+
+def _map_message_annotation(message: str) -> dict[str, Any]:
+    return {
+        "text": message,
+        "x": 0.5,
+        "y": 0.5,
+        "xref": "paper",
+        "yref": "paper",
+        "showarrow": False,
+        "font": {"color": "#FFFFFF", "size": 14, "family": DEFAULT_FONT_FAMILY},
+    }
 
 
 def _color_for_value(value: float, max_value: float) -> str:
     if max_value <= 0 or value <= 0:
         return BASE_REGION_COLOR
-    ratio = value / max_value if max_value else 0.0
-    ratio = max(0.0, min(1.0, ratio))
-    color = sample_colorscale(COLOR_SCALE, [ratio])[0]
-    if color.startswith("rgb(") and color.endswith(")"):
-        return f"rgba({color[4:-1]}, 0.85)"
-    return color
+    index = int(value / max_value * (COLOR_LUT_SIZE - 1))
+    return COLOR_LUT[min(COLOR_LUT_SIZE - 1, index)]
 
 
-def _selected_fill_color(color: str) -> str:
-    try:
-        if color.startswith("rgba("):
-            parts = color[5:-1].split(",")
-        elif color.startswith("rgb("):
-            parts = color[4:-1].split(",")
-        else:
-            return color
-        parts = [float(part.strip()) for part in parts]
-        if len(parts) >= 3:
-            r, g, b = parts[:3]
-            alpha = parts[3] if len(parts) > 3 else 1.0
-            # lighten colour toward white
-            lighten_factor = 0.25
-            r = min(255, int(r + (255 - r) * lighten_factor))
-            g = min(255, int(g + (255 - g) * lighten_factor))
-            b = min(255, int(b + (255 - b) * lighten_factor))
-            alpha = min(1.0, alpha + 0.1)
-            return f"rgba({r}, {g}, {b}, {alpha:.2f})"
-    except Exception:
-        return color
-    return color
+def _build_color_lut(size: int) -> tuple[str, ...]:
+    colors = sample_colorscale(COLOR_SCALE, [index / (size - 1) for index in range(size)])
+    return tuple(
+        f"rgba({color[4:-1]}, 0.85)" if color.startswith("rgb(") and color.endswith(")") else color
+        for color in colors
+    )
+
+
+COLOR_LUT_SIZE = 256
+COLOR_LUT = _build_color_lut(COLOR_LUT_SIZE)
+
+
+def _selection_shapes(region_code: str | None) -> list[dict[str, Any]]:
+    """Outline the selected region with a layout shape so toggling it can be patched in place."""
+    path = REGION_PATHS.get(region_code) if region_code else None
+    if not path:
+        return []
+    return [
+        {
+            "type": "path",
+            "path": path,
+            "xref": "x",
+            "yref": "y",
+            "layer": "above",
+            "fillcolor": REGION_SELECTED_FILL_COLOR,
+            "line": {"color": REGION_SELECTED_BORDER_COLOR, "width": 3},
+        }
+    ]
+
+
+AMOUNT_SEPARATOR_TABLE = str.maketrans(",.", " ,")
 
 
 def _format_amount(value: float) -> str:
-    try:
-        normalized = float(value)
-    except (TypeError, ValueError):
-        normalized = 0.0
-    return f"{normalized:,.1f}".replace(",", " ").replace(".", ",")
+    if type(value) is not float:
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = 0.0
+    return f"{value:,.1f}".translate(AMOUNT_SEPARATOR_TABLE)
 
 
 add_report(
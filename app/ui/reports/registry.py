@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, Optional
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Mapping, Optional
 
 from dash import Dash
 from dash.development.base_component import Component
@@ -16,9 +17,11 @@ class ReportEntry:
     register_callbacks: Callable[[Dash], None]
     permission_resource: Optional[str] = None
     description: Optional[str] = None
+    frame_style: Optional[Mapping[str, str]] = None
 
 
 _REGISTRY: Dict[str, ReportEntry] = {}
+_REGISTRY_VIEW: Mapping[str, ReportEntry] = MappingProxyType(_REGISTRY)
 
 
 def add_report(entry: ReportEntry) -> None:
@@ -26,13 +29,13 @@ def add_report(entry: ReportEntry) -> None:
 
 
 def get_report(route: str) -> ReportEntry | None:
-    return _REGISTRY.get(route)
+    return _REGISTRY_VIEW.get(route)
 
 
 def iter_reports() -> Iterable[ReportEntry]:
-    return _REGISTRY.values()
+    return _REGISTRY_VIEW.values()
 
 
 def register_all_callbacks(app: Dash) -> None:
-    for entry in _REGISTRY.values():
+    for entry in _REGISTRY_VIEW.values():
         entry.register_callbacks(app)
@@ -1,27 +1,79 @@
 from __future__ import annotations
 
 import logging
-from copy import deepcopy
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import astuple
+from functools import lru_cache
 from datetime import date, datetime
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
+import plotly.io as pio
 from dash import Input, Output, State, dash_table, dcc, html, ctx
 from dash.development.base_component import Component
 
+from app.core.cache import TTLCache
+from app.core.settings import get_settings
 from app.dwh import (
+    DashboardFiltersSnapshot,
     DashboardQueryParams,
     DwhDashboardService,
+    InvalidColumnFilterError,
+    coerce_column_filter,
     get_dwh_dashboard_service,
 )
 from .registry import ReportEntry, add_report
 
 logger = logging.getLogger(__name__)
 
+# Filter values change rarely; the layout built from one snapshot serves every page visit within the TTL.
+# Components are only serialized at request time, so the same tree can be shared across users.
+_LAYOUT_CACHE: TTLCache[Component] = TTLCache(maxsize=8, ttl=get_settings().dwh_cache_ttl_seconds)
+_QUERY_CACHE: TTLCache[Future] = TTLCache(maxsize=256, ttl=get_settings().dwh_cache_ttl_seconds)
+_QUERY_LOCK = threading.Lock()
+_FIGURE_CACHE: TTLCache[tuple[list[dict[str, Any]], dict[str, Any]]] = TTLCache(
+    maxsize=64, ttl=get_settings().dwh_cache_ttl_seconds
+)
+_QUERY_POOL = ThreadPoolExecutor(max_workers=5, thread_name_prefix="sales-dashboard")
+
 FIGURE_BG_COLOR = "#ffffff"
 DEFAULT_FONT_FAMILY = "Open Sans, Arial, sans-serif"
 SPINNER_COLOR = "#55246A"
+# Figures are returned as plain dicts, so the default plotly template go.Figure used to attach is embedded once here.
+FIGURE_BASE_LAYOUT = {
+    "template": pio.templates[pio.templates.default].to_plotly_json(),
+    "plot_bgcolor": FIGURE_BG_COLOR,
+    "paper_bgcolor": FIGURE_BG_COLOR,
+    "font": {"family": DEFAULT_FONT_FAMILY},
+}
+REGION_LAYOUT = {**FIGURE_BASE_LAYOUT, "title": {"text": "Распределение продаж по регионам"}}
+MONTHLY_LAYOUT = {
+    **FIGURE_BASE_LAYOUT,
+    "title": {"text": "Динамика продаж по месяцам"},
+    "xaxis": {"title": {"text": "Месяц"}},
+    "yaxis": {"title": {"text": "Выручка, ₽"}},
+}
+CATEGORY_LAYOUT = {
+    **FIGURE_BASE_LAYOUT,
+    "title": {"text": "Продажи по категориям"},
+    "xaxis": {"title": {"text": "Категория"}},
+    "yaxis": {"title": {"text": "Выручка, ₽"}},
+}
+SCATTER_LAYOUT = {
+    **FIGURE_BASE_LAYOUT,
+    "title": {"text": "Прибыль vs Количество"},
+    "xaxis": {"title": {"text": "Количество"}},
+    "yaxis": {"title": {"text": "Прибыль, ₽"}},
+    "dragmode": "select",
+}
+SCATTER_HOVER_TEMPLATE = (
+    "Категория: %{fullData.name}<br>"
+    "Количество: %{x}<br>Прибыль: %{y:,.0f} ₽<br>"
+    "Сумма: %{customdata[1]:,.0f} ₽<br>"
+    "ID продажи: %{customdata[0]}<extra></extra>"
+)
+MONTH_ABBREVIATIONS = ("", "янв", "фев", "мар", "апр", "май", "июн", "июл", "авг", "сен", "окт", "ноя", "дек")
 
 
 def _default_interactions() -> dict[str, Any]:
@@ -34,6 +86,66 @@ def _default_interactions() -> dict[str, Any]:
     }
 
 
+NOT_CONFIGURED_MESSAGE = "Источник данных не настроен. Укажите DWH_DB_DSN."
+LOAD_FAILED_MESSAGE = "Не удалось загрузить данные. Проверьте соединение с DWH."
+INVALID_FILTER_MESSAGE = "Некорректное значение фильтра в столбце «{column}»."
+
+DASHBOARD_QUERIES = ("region_totals", "monthly_revenue", "category_totals", "profit_vs_quantity", "count_sales")
+TABLE_PAGE_SIZE = 20
+HIDDEN_STYLE = {"display": "none"}
+VISIBLE_STYLE = {"display": "inline"}
+# Upper bound on scatter points shipped to the browser; the service returns up to SCATTER_ROW_LIMIT rows.
+MAX_SCATTER_POINTS = 2000
+# DataTable filter operators (symbolic and word forms) mapped to the service's operators.
+FILTER_OPERATORS = (
+    (">=", ">="),
+    ("ge ", ">="),
+    ("<=", "<="),
+    ("le ", "<="),
+    ("!=", "!="),
+    ("ne ", "!="),
+    ("<", "<"),
+    ("lt ", "<"),
+    (">", ">"),
+    ("gt ", ">"),
+    ("=", "="),
+    ("eq ", "="),
+    ("contains ", "contains"),
+    ("datestartswith ", "datestartswith"),
+)
+
+RAW_FILTER_INPUTS = (
+    Input("dashboard-region-filter", "value"),
+    Input("dashboard-category-filter", "value"),
+    Input("dashboard-segment-filter", "value"),
+    Input("dashboard-channel-filter", "value"),
+    Input("dashboard-date-filter", "start_date"),
+    Input("dashboard-date-filter", "end_date"),
+    Input("dashboard-interactions-store", "data"),
+)
+# Every figure and the table are refreshed by their own callback from the same debounced filter state.
+FILTER_INPUTS = (Input("dashboard-filters-debounced", "data"),)
+FILTER_DEBOUNCE_MS = 150
+
+# Coalesces bursts of filter changes in the browser: only the last change within the window is published.
+DEBOUNCE_FILTERS_JS = """
+function (regions, categories, segments, channels, startDate, endDate, interactions) {
+    const state = window.salesDashboardDebounce = window.salesDashboardDebounce || {sequence: 0};
+    const sequence = ++state.sequence;
+    const snapshot = [regions, categories, segments, channels, startDate, endDate, interactions];
+    return new Promise(function (resolve) {
+        setTimeout(function () {
+            resolve(sequence === state.sequence ? snapshot : window.dash_clientside.no_update);
+        }, %d);
+    });
+}
+""" % FILTER_DEBOUNCE_MS
+
+def _copy_interactions(current: dict[str, Any]) -> dict[str, Any]:
+    # Values are flat lists of scalars, so copying each list is enough to keep the State untouched.
+    return {key: list(value) if isinstance(value, list) else value for key, value in current.items()}
+
+
 TABLE_COLUMNS: list[dict[str, Any]] = [
     {"id": "sale_date", "name": "Дата"},
     {"id": "customer_name", "name": "Клиент"},
@@ -47,9 +159,14 @@ TABLE_COLUMNS: list[dict[str, Any]] = [
     {"id": "sales_channel", "name": "Канал"},
     {"id": "payment_method", "name": "Оплата"},
 ]
+TABLE_COLUMN_IDS = tuple(column["id"] for column in TABLE_COLUMNS)
+TABLE_COLUMN_NAMES = {column["id"]: column["name"] for column in TABLE_COLUMNS}
 
 
+@lru_cache(maxsize=1)
 def _service_or_none() -> DwhDashboardService | None:
+    # Settings are cached for the process lifetime, so the outcome (service or missing DSN) cannot change;
+    # call _service_or_none.cache_clear() after set_dwh_dashboard_service() to pick up a replacement.
     try:
         return get_dwh_dashboard_service()
     except ValueError:
@@ -57,35 +174,100 @@ def _service_or_none() -> DwhDashboardService | None:
         return None
 
 
+def _cached_dashboard_layout(service: DwhDashboardService) -> Component:
+    cached = _LAYOUT_CACHE.get(service)
+    if cached is not None:
+        return cached
+    snapshot = service.get_filters_snapshot()
+    options = {
+        field: [{"label": value, "value": value} for value in getattr(snapshot, field)]
+        for field in ("regions", "categories", "segments", "channels")
+    }
+    dashboard = _dashboard_layout(snapshot, options)
+    _LAYOUT_CACHE.set(service, dashboard)
+    return dashboard
+
+
+def _params_key(params: DashboardQueryParams) -> tuple[Any, ...]:
+    return tuple(tuple(value) if isinstance(value, list) else value for value in astuple(params))
+
+
+def _run_query(service: DwhDashboardService, query_name: str, params: DashboardQueryParams, **options: Any) -> Any:
+    """Return one dashboard query result, starting all dashboard queries for these filters in parallel.
+
+    Futures are cached for the TTL, so the per-figure callbacks share the in-flight or finished queries.
+    Keyword options (table paging, sorting) must be hashable and are passed through to the query.
+    """
+    key, future = _submit_query(service, query_name, params, **options)
+    try:
+        return future.result()
+    except Exception:
+        _QUERY_CACHE.pop(key)
+        raise
+
+
+def _count_sales(
+    service: DwhDashboardService,
+    params: DashboardQueryParams,
+    column_filters: tuple[tuple[str, str, Any], ...],
+) -> int:
+    # Without table filters this is the count prefetched alongside the figure queries (no options).
+    if not column_filters:
+        return _run_query(service, "count_sales", params)
+    return _run_query(service, "count_sales", params, column_filters=column_filters)
+
+
+def _submit_query(
+    service: DwhDashboardService,
+    query_name: str,
+    params: DashboardQueryParams,
+    **options: Any,
+) -> tuple[tuple[Any, ...], Future]:
+    params_key = _params_key(params)
+    key = (service, query_name, params_key, tuple(sorted(options.items())))
+    with _QUERY_LOCK:
+        for name in DASHBOARD_QUERIES:
+            shared_key = (service, name, params_key, ())
+            if _QUERY_CACHE.get(shared_key) is None:
+                _QUERY_CACHE.set(shared_key, _QUERY_POOL.submit(getattr(service, name), params))
+        future = _QUERY_CACHE.get(key)
+        if future is None:
+            future = _QUERY_POOL.submit(getattr(service, query_name), params, **options)
+            _QUERY_CACHE.set(key, future)
+    return key, future
+
+
 def layout() -> Component:
     service = _service_or_none()
     try:
-        snapshot = service.get_filters_snapshot() if service else None
+        if service:
+            return _cached_dashboard_layout(service)
     except Exception as exc:  # pragma: no cover - layout fallback
         logger.exception("Failed to load dashboard filters: %s", exc)
-        snapshot = None
-
-    if not snapshot:
-        return dbc.Container(
-            [
-                html.Div(html.H2("Дашборд"), className="report-header"),
-                dbc.Alert(
-                    "Источник данных не настроен. Проверьте переменную окружения DWH_DB_DSN.",
-                    color="warning",
-                    className="mt-3",
-                ),
-            ],
-            fluid=True,
-            className="gy-4",
-            style={"fontFamily": DEFAULT_FONT_FAMILY},
-        )
 
+    return dbc.Container(
+        [
+            html.Div(html.H2("Дашборд"), className="report-header"),
+            dbc.Alert(
+                "Источник данных не настроен. Проверьте переменную окружения DWH_DB_DSN.",
+                color="warning",
+                className="mt-3",
+            ),
+        ],
+        fluid=True,
+        className="gy-4",
+        style={"fontFamily": DEFAULT_FONT_FAMILY},
+    )
+
+
+def _dashboard_layout(snapshot: DashboardFiltersSnapshot, options: dict[str, list[dict[str, str]]]) -> Component:
     start_date = snapshot.min_date.isoformat() if snapshot.min_date else None
     end_date = snapshot.max_date.isoformat() if snapshot.max_date else None
 
     return dbc.Container(
         [
             dcc.Store(id="dashboard-interactions-store", data=_default_interactions()),
+            dcc.Store(id="dashboard-filters-debounced"),
             html.Div(html.H2("Продажи и прибыль"), className="report-header"),
             dbc.Alert(id="dashboard-feedback", is_open=False, color="info", className="mt-3"),
             dbc.Card(
@@ -98,7 +280,7 @@ def layout() -> Component:
                                         dbc.Label("Регион"),
                                         dcc.Dropdown(
                                             id="dashboard-region-filter",
-                                            options=[{"label": value, "value": value} for value in snapshot.regions],
+                                            options=options["regions"],
                                             value=[],
                                             placeholder="Все регионы",
                                             multi=True,
@@ -112,7 +294,7 @@ def layout() -> Component:
                                         dbc.Label("Категория"),
                                         dcc.Dropdown(
                                             id="dashboard-category-filter",
-                                            options=[{"label": value, "value": value} for value in snapshot.categories],
+                                            options=options["categories"],
                                             value=[],
                                             placeholder="Все категории",
                                             multi=True,
@@ -126,7 +308,7 @@ def layout() -> Component:
                                         dbc.Label("Сегмент клиента"),
                                         dcc.Dropdown(
                                             id="dashboard-segment-filter",
-                                            options=[{"label": value, "value": value} for value in snapshot.segments],
+                                            options=options["segments"],
                                             value=[],
                                             placeholder="Все сегменты",
                                             multi=True,
@@ -140,7 +322,7 @@ def layout() -> Component:
                                         dbc.Label("Канал продаж"),
                                         dcc.Dropdown(
                                             id="dashboard-channel-filter",
-                                            options=[{"label": value, "value": value} for value in snapshot.channels],
+                                            options=options["channels"],
                                             value=[],
                                             placeholder="Все каналы",
                                             multi=True,
@@ -180,6 +362,16 @@ def layout() -> Component:
                                     ],
                                     md=3,
                                 ),
+                                dbc.Col(
+                                    html.Small(
+                                        "Обновление данных…",
+                                        id="dashboard-refresh-status",
+                                        className="text-muted",
+                                        style=HIDDEN_STYLE,
+                                    ),
+                                    md=3,
+                                    className="d-flex align-items-end",
+                                ),
                             ],
                             className="gy-3",
                         ),
@@ -268,9 +460,13 @@ def layout() -> Component:
                                     id="dashboard-sales-table",
                                     data=[],
                                     columns=TABLE_COLUMNS,
-                                    page_size=20,
-                                    sort_action="native",
-                                    filter_action="native",
+                                    page_current=0,
+                                    page_size=TABLE_PAGE_SIZE,
+                                    page_action="custom",
+                                    sort_action="custom",
+                                    sort_by=[],
+                                    filter_action="custom",
+                                    filter_query="",
                                     style_table={"overflowX": "auto"},
                                     style_cell={
                                         "whiteSpace": "nowrap",
@@ -306,7 +502,7 @@ def register_callbacks(app):
         prevent_initial_call=True,
     )
     def update_interactions(region_click, category_click, monthly_relayout, scatter_selected, reset_clicks, current):
-        current = deepcopy(current) if current else _default_interactions()
+        current = _copy_interactions(current) if current else _default_interactions()
         trigger = ctx.triggered_id
         if trigger == "dashboard-reset-interactions":
             return _default_interactions()
@@ -326,85 +522,101 @@ def register_callbacks(app):
 
         return current
 
+    app.clientside_callback(DEBOUNCE_FILTERS_JS, Output("dashboard-filters-debounced", "data"), *RAW_FILTER_INPUTS)
+
+    @app.callback(Output("dashboard-graph-region", "figure"), *FILTER_INPUTS, prevent_initial_call=True)
+    def refresh_region(filters):
+        return _refresh_figure(filters, "region_totals", _build_region_figure)
+
+    @app.callback(Output("dashboard-graph-monthly", "figure"), *FILTER_INPUTS, prevent_initial_call=True)
+    def refresh_monthly(filters):
+        return _refresh_figure(filters, "monthly_revenue", _build_monthly_figure)
+
+    @app.callback(Output("dashboard-graph-category", "figure"), *FILTER_INPUTS, prevent_initial_call=True)
+    def refresh_category(filters):
+        return _refresh_figure(filters, "category_totals", _build_category_figure)
+
+    @app.callback(Output("dashboard-graph-scatter", "figure"), *FILTER_INPUTS, prevent_initial_call=True)
+    def refresh_scatter(filters):
+        return _refresh_figure(filters, "profit_vs_quantity", _build_scatter_figure)
+
     @app.callback(
-        Output("dashboard-graph-region", "figure"),
-        Output("dashboard-graph-monthly", "figure"),
-        Output("dashboard-graph-category", "figure"),
-        Output("dashboard-graph-scatter", "figure"),
         Output("dashboard-sales-table", "data"),
         Output("dashboard-sales-table", "columns"),
+        Output("dashboard-sales-table", "page_count"),
+        Output("dashboard-sales-table", "page_current"),
         Output("dashboard-feedback", "children"),
         Output("dashboard-feedback", "color"),
         Output("dashboard-feedback", "is_open"),
-        Input("dashboard-region-filter", "value"),
-        Input("dashboard-category-filter", "value"),
-        Input("dashboard-segment-filter", "value"),
-        Input("dashboard-channel-filter", "value"),
-        Input("dashboard-date-filter", "start_date"),
-        Input("dashboard-date-filter", "end_date"),
-        Input("dashboard-interactions-store", "data"),
+        *FILTER_INPUTS,
+        Input("dashboard-sales-table", "page_current"),
+        Input("dashboard-sales-table", "sort_by"),
+        Input("dashboard-sales-table", "filter_query"),
+        State("dashboard-sales-table", "page_size"),
+        prevent_initial_call=True,
+        running=[
+            (Output("dashboard-refresh-status", "style"), VISIBLE_STYLE, HIDDEN_STYLE),
+            (Output("dashboard-reset-interactions", "disabled"), True, False),
+        ],
     )
-    def refresh_dashboard(region_filter, category_filter, segment_filter, channel_filter, start_date, end_date, interactions):
+    def refresh_table(filters, page_current, sort_by, filter_query, page_size):
         service = _service_or_none()
         if not service:
-            message = "Источник данных не настроен. Укажите DWH_DB_DSN."
-            empty = _empty_figure(message)
-            return (
-                empty,
-                empty,
-                empty,
-                empty,
-                [],
-                TABLE_COLUMNS,
-                message,
-                "warning",
-                True,
-            )
-
-        interactions = interactions or _default_interactions()
-        params = _compose_query_params(
-            region_filter,
-            category_filter,
-            segment_filter,
-            channel_filter,
-            start_date,
-            end_date,
-            interactions,
-        )
+            return [], TABLE_COLUMNS, 0, 0, NOT_CONFIGURED_MESSAGE, "warning", True
 
+        # Only page navigation keeps the current page; any filter or sort change starts over.
+        page = (page_current or 0) if "dashboard-sales-table.page_current" in ctx.triggered_prop_ids else 0
+        page_size = page_size or TABLE_PAGE_SIZE
+        params = _compose_query_params(*(filters or ()))
+        try:
+            column_filters = _parse_filter_query(filter_query)
+        except InvalidColumnFilterError as exc:
+            message = INVALID_FILTER_MESSAGE.format(column=TABLE_COLUMN_NAMES.get(exc.column, exc.column))
+            return [], TABLE_COLUMNS, 0, 0, message, "warning", True
         try:
-            region_data = service.region_totals(params)
-            monthly_data = service.monthly_revenue(params)
-            category_data = service.category_totals(params)
-            scatter_data = service.profit_vs_quantity(params)
-            table_rows = service.detailed_sales(params)
-
-            return (
-                _build_region_figure(region_data),
-                _build_monthly_figure(monthly_data),
-                _build_category_figure(category_data),
-                _build_scatter_figure(scatter_data),
-                _prepare_table_rows(table_rows),
-                TABLE_COLUMNS,
-                "",
-                "info",
-                False,
-            )
+            total = _count_sales(service, params, column_filters)
+            page_options = {"limit": page_size, "order_by": _sort_columns(sort_by), "column_filters": column_filters}
+            table_rows = _run_query(service, "detailed_sales", params, offset=page * page_size, **page_options)
+            # Warm the next page in the background so paging forward does not wait on the DWH.
+            if (page + 1) * page_size < total:
+                _submit_query(service, "detailed_sales", params, offset=(page + 1) * page_size, **page_options)
         except Exception as exc:  # pragma: no cover - runtime diagnostics
-            logger.exception("Dashboard refresh failed: %s", exc)
-            message = "Не удалось загрузить данные. Проверьте соединение с DWH."
-            empty = _empty_figure(message)
-            return (
-                empty,
-                empty,
-                empty,
-                empty,
-                [],
-                TABLE_COLUMNS,
-                message,
-                "danger",
-                True,
-            )
+            logger.exception("Dashboard table refresh failed: %s", exc)
+            return [], TABLE_COLUMNS, 0, 0, LOAD_FAILED_MESSAGE, "danger", True
+        page_count = max(1, -(-total // page_size))
+        return _prepare_table_rows(table_rows), TABLE_COLUMNS, page_count, page, "", "info", False
+
+
+def _refresh_figure(
+    filters: list[Any] | None,
+    query_name: str,
+    builder: Callable[[list[dict[str, Any]]], dict[str, Any]],
+) -> dict[str, Any]:
+    """Query and build one dashboard figure, falling back to a message figure on failure."""
+    service = _service_or_none()
+    if not service:
+        return _empty_figure(NOT_CONFIGURED_MESSAGE)
+    try:
+        data = _run_query(service, query_name, _compose_query_params(*(filters or ())))
+        return _cached_figure(query_name, data, builder)
+    except Exception as exc:  # pragma: no cover - runtime diagnostics
+        logger.exception("Dashboard figure refresh failed (%s): %s", query_name, exc)
+        return _empty_figure(LOAD_FAILED_MESSAGE)
+
+
+def _cached_figure(
+    query_name: str,
+    data: list[dict[str, Any]],
+    builder: Callable[[list[dict[str, Any]]], dict[str, Any]],
+) -> dict[str, Any]:
+    """Reuse the built figure while the cached query result is unchanged."""
+    key = (query_name, id(data))
+    cached = _FIGURE_CACHE.get(key)
+    if cached is not None and cached[0] is data:
+        return cached[1]
+    figure = builder(data)
+    _FIGURE_CACHE.set(key, (data, figure))
+    return figure
 
 
 def _extract_label(click_data: Any) -> str | None:
@@ -447,47 +659,85 @@ def _extract_scatter_ranges(selected: Any) -> tuple[list[float | None], list[flo
     if qty_range and profit_range:
         return ([float(qty_range[0]), float(qty_range[1])], [float(profit_range[0]), float(profit_range[1])])
 
-    points = selected.get("points") or []
-    if not points:
-        return ([None, None], [None, None])
-    quantities = [float(point.get("x")) for point in points if point.get("x") is not None]
-    profits = [float(point.get("y")) for point in points if point.get("y") is not None]
-    if not quantities or not profits:
+    # Lasso selections can carry thousands of points: track the bounds in one pass without temporary lists.
+    qty_min = qty_max = profit_min = profit_max = None
+    for point in selected.get("points") or ():
+        x = point.get("x")
+        if x is not None:
+            x = float(x)
+            if qty_min is None or x < qty_min:
+                qty_min = x
+            if qty_max is None or x > qty_max:
+                qty_max = x
+        y = point.get("y")
+        if y is not None:
+            y = float(y)
+            if profit_min is None or y < profit_min:
+                profit_min = y
+            if profit_max is None or y > profit_max:
+                profit_max = y
+    if qty_min is None or profit_min is None:
         return ([None, None], [None, None])
-    return ([min(quantities), max(quantities)], [min(profits), max(profits)])
+    return ([qty_min, qty_max], [profit_min, profit_max])
 
 
-def _compose_query_params(
-    regions: Iterable[str] | None,
-    categories: Iterable[str] | None,
-    segments: Iterable[str] | None,
-    channels: Iterable[str] | None,
-    start_date: str | None,
-    end_date: str | None,
-    interactions: dict[str, Any],
-) -> DashboardQueryParams:
-    def parse_date(value: str | None) -> date | None:
-        if not value:
-            return None
-        try:
-            return datetime.fromisoformat(value).date()
-        except ValueError:
-            return None
+def _sort_columns(sort_by: list[dict[str, Any]] | None) -> tuple[tuple[str, bool], ...]:
+    return tuple(
+        (item["column_id"], item.get("direction") == "desc")
+        for item in sort_by or []
+        if isinstance(item, dict) and item.get("column_id")
+    )
 
-    region_list = list(regions or [])
-    if not region_list:
-        region_list = list(interactions.get("regions") or [])
 
-    category_list = list(categories or [])
-    if not category_list:
-        category_list = list(interactions.get("categories") or [])
+def _parse_filter_query(filter_query: str | None) -> tuple[tuple[str, str, Any], ...]:
+    """Translate DataTable filter_query (``{col} op value && ...``) into (column, operator, value) triples.
+
+    Values are converted to their column's type; raises InvalidColumnFilterError when one does not fit.
+    """
+    if not filter_query:
+        return ()
+    parsed: list[tuple[str, str, Any]] = []
+    for part in filter_query.split(" && "):
+        start = part.find("{")
+        end = part.find("}", start + 1)
+        if start < 0 or end < 0:
+            continue
+        column = part[start + 1 : end]
+        # The operator directly follows the column; tokens inside the value are part of the value.
+        expression = part[end + 1 :].lstrip()
+        for token, operator in FILTER_OPERATORS:
+            if not expression.startswith(token):
+                continue
+            value_text = expression[len(token) :].strip()
+            value = value_text
+            if len(value_text) >= 2 and value_text[0] == value_text[-1] and value_text[0] in "'\"`":
+                value = value_text[1:-1].replace("\\" + value_text[0], value_text[0])
+            if column and value_text:
+                parsed.append((column, operator, coerce_column_filter(column, operator, value)))
+            break
+    return tuple(parsed)
+
+
+def _compose_query_params(
+    regions: Iterable[str] | None = None,
+    categories: Iterable[str] | None = None,
+    segments: Iterable[str] | None = None,
+    channels: Iterable[str] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    interactions: dict[str, Any] | None = None,
+) -> DashboardQueryParams:
+    interactions = interactions or _default_interactions()
+    # Explicit filters win over chart interactions; both are only copied into the params once.
+    region_list = regions or interactions.get("regions") or None
+    category_list = categories or interactions.get("categories") or None
 
-    start = parse_date(start_date)
-    end = parse_date(end_date)
+    start = _parse_iso_date(start_date)
+    end = _parse_iso_date(end_date)
 
     month_range = interactions.get("month_range") or [None, None]
-    month_start = parse_date(month_range[0]) if month_range[0] else None
-    month_end = parse_date(month_range[1]) if len(month_range) > 1 and month_range[1] else None
+    month_start = _parse_iso_date(month_range[0])
+    month_end = _parse_iso_date(month_range[1]) if len(month_range) > 1 else None
 
     if month_start:
         start = max(start, month_start) if start else month_start
@@ -497,205 +747,209 @@ def _compose_query_params(
     qty_range = interactions.get("quantity_range") or [None, None]
     profit_range = interactions.get("profit_range") or [None, None]
 
-    params = DashboardQueryParams(
-        regions=region_list or None,
-        categories=category_list or None,
-        segments=list(segments or []) or None,
-        channels=list(channels or []) or None,
-        start_date=start,
-        end_date=end,
-    )
-
     qty_min = qty_range[0] if isinstance(qty_range, list) and qty_range else None
     qty_max = qty_range[1] if isinstance(qty_range, list) and len(qty_range) > 1 else None
     profit_min = profit_range[0] if isinstance(profit_range, list) and profit_range else None
     profit_max = profit_range[1] if isinstance(profit_range, list) and len(profit_range) > 1 else None
 
-    if qty_min is not None:
-        params.quantity_min = float(qty_min)
-    if qty_max is not None:
-        params.quantity_max = float(qty_max)
-    if profit_min is not None:
-        params.profit_min = float(profit_min)
-    if profit_max is not None:
-        params.profit_max = float(profit_max)
+    return DashboardQueryParams(
+        regions=list(region_list) if region_list else None,
+        categories=list(category_list) if category_list else None,
+        segments=list(segments) if segments else None,
+        channels=list(channels) if channels else None,
+        start_date=start,
+        end_date=end,
+        quantity_min=_optional_float(qty_min),
+        quantity_max=_optional_float(qty_max),
+        profit_min=_optional_float(profit_min),
+        profit_max=_optional_float(profit_max),
+    )
+
+
+@lru_cache(maxsize=256)
+def _parse_iso_date(value: Any) -> date | None:
+    """Parse the leading ISO date of DatePicker values and relayout ranges such as "2024-01-15 12:00:00.5"."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
 
-    return params
 
+def _optional_float(value: Any) -> float | None:
+    return float(value) if value is not None else None
 
-def _build_region_figure(data: list[dict[str, Any]]) -> go.Figure:
+
+def _build_region_figure(data: list[dict[str, Any]]) -> dict[str, Any]:
     if not data:
         return _empty_figure("Нет данных по регионам")
-    labels = [item["region"] for item in data]
-    values = [item["total_amount"] for item in data]
-    fig = go.Figure(
-        data=[
-            go.Pie(
-                labels=labels,
-                values=values,
-                hole=0.35,
-                hovertemplate="Регион: %{label}<br>Продажи: %{value:,.0f} ₽<extra></extra>",
-            )
-        ]
-    )
-    fig.update_layout(title="Распределение продаж по регионам")
-    fig.update_layout(plot_bgcolor=FIGURE_BG_COLOR, paper_bgcolor=FIGURE_BG_COLOR)
-    fig.update_layout(font={"family": DEFAULT_FONT_FAMILY})
-    return fig
+    return {
+        "data": [
+            {
+                "type": "pie",
+                "labels": [item["region"] for item in data],
+                "values": [item["total_amount"] for item in data],
+                "hole": 0.35,
+                "hovertemplate": "Регион: %{label}<br>Продажи: %{value:,.0f} ₽<extra></extra>",
+            }
+        ],
+        "layout": REGION_LAYOUT,
+    }
 
 
-def _build_monthly_figure(data: list[dict[str, Any]]) -> go.Figure:
+def _build_monthly_figure(data: list[dict[str, Any]]) -> dict[str, Any]:
     if not data:
         return _empty_figure("Нет данных по месяцам")
     x_values = [datetime.combine(item["month_start"], datetime.min.time()) for item in data]
     y_values = [item["total_revenue"] for item in data]
     months_ru = [_format_month(value) for value in x_values]
-    fig = go.Figure(
-        data=[
-            go.Scatter(
-                x=x_values,
-                y=y_values,
-                customdata=months_ru,
-                mode="lines+markers",
-                hovertemplate="Месяц: %{customdata}<br>Выручка: %{y:,.0f} ₽<extra></extra>",
-            )
-        ]
-    )
-    fig.update_layout(title="Динамика продаж по месяцам", xaxis_title="Месяц", yaxis_title="Выручка, ₽")
-    fig.update_xaxes(tickvals=x_values, ticktext=months_ru)
-    fig.update_layout(plot_bgcolor=FIGURE_BG_COLOR, paper_bgcolor=FIGURE_BG_COLOR)
-    fig.update_layout(font={"family": DEFAULT_FONT_FAMILY})
-    return fig
+    return {
+        "data": [
+            {
+                "type": "scatter",
+                "x": x_values,
+                "y": y_values,
+                "customdata": months_ru,
+                "mode": "lines+markers",
+                "hovertemplate": "Месяц: %{customdata}<br>Выручка: %{y:,.0f} ₽<extra></extra>",
+            }
+        ],
+        "layout": {
+            **MONTHLY_LAYOUT,
+            "xaxis": {**MONTHLY_LAYOUT["xaxis"], "tickvals": x_values, "ticktext": months_ru},
+        },
+    }
 
 
-def _build_category_figure(data: list[dict[str, Any]]) -> go.Figure:
+def _build_category_figure(data: list[dict[str, Any]]) -> dict[str, Any]:
     if not data:
         return _empty_figure("Нет данных по категориям")
-    fig = go.Figure(
-        data=[
-            go.Bar(
-                x=[item["category"] for item in data],
-                y=[item["total_amount"] for item in data],
-                hovertemplate="Категория: %{x}<br>Продажи: %{y:,.0f} ₽<extra></extra>",
-            )
-        ]
-    )
-    fig.update_layout(title="Продажи по категориям", xaxis_title="Категория", yaxis_title="Выручка, ₽")
-    fig.update_layout(plot_bgcolor=FIGURE_BG_COLOR, paper_bgcolor=FIGURE_BG_COLOR)
-    fig.update_layout(font={"family": DEFAULT_FONT_FAMILY})
-    return fig
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "x": [item["category"] for item in data],
+                "y": [item["total_amount"] for item in data],
+                "hovertemplate": "Категория: %{x}<br>Продажи: %{y:,.0f} ₽<extra></extra>",
+            }
+        ],
+        "layout": CATEGORY_LAYOUT,
+    }
 
 
-def _build_scatter_figure(data: list[dict[str, Any]]) -> go.Figure:
+def _build_scatter_figure(data: list[dict[str, Any]]) -> dict[str, Any]:
     if not data:
         return _empty_figure("Нет данных для точечной диаграммы")
 
+    # One pass groups the rows and finds the largest amount for marker scaling.
     by_category: dict[str | None, list[dict[str, Any]]] = {}
+    max_amount = 0
     for row in data:
         by_category.setdefault(row.get("category"), []).append(row)
+        amount = row.get("total_amount") or 0
+        if amount > max_amount:
+            max_amount = amount
+    if len(data) > MAX_SCATTER_POINTS:
+        by_category = _stratified_sample(by_category, MAX_SCATTER_POINTS)
 
-    max_amount = max((row.get("total_amount") or 0) for row in data) or 1
-    scale = max_amount / 30
+    scale = (max_amount or 1) / 30
 
-    fig = go.Figure()
+    traces: list[dict[str, Any]] = []
     for category, rows in by_category.items():
-        quantities = [row.get("quantity") for row in rows]
-        profits = [row.get("profit") for row in rows]
-        amounts = [row.get("total_amount") or 0 for row in rows]
-        sizes = [max(8, min(32, amount / scale)) for amount in amounts]
-        custom = [
-            (
-                row.get("sale_id"),
-                row.get("sale_date"),
-                amount,
-            )
-            for row, amount in zip(rows, amounts)
-        ]
-        fig.add_trace(
-            go.Scatter(
-                x=quantities,
-                y=profits,
-                mode="markers",
-                marker={"size": sizes, "opacity": 0.7},
-                name=category or "Без категории",
-                customdata=custom,
-                hovertemplate=(
-                    "Категория: %{fullData.name}<br>"
-                    "Количество: %{x}<br>Прибыль: %{y:,.0f} ₽<br>"
-                    "Сумма: %{customdata[2]:,.0f} ₽<br>"
-                    "ID продажи: %{customdata[0]}<extra></extra>"
-                ),
-            )
+        quantities: list[Any] = []
+        profits: list[Any] = []
+        sizes: list[float] = []
+        custom: list[tuple[Any, int]] = []
+        for row in rows:
+            amount = row.get("total_amount") or 0
+            quantities.append(row.get("quantity"))
+            profits.append(row.get("profit"))
+            sizes.append(max(8, min(32, amount / scale)))
+            # Only the id and the whole-rouble amount are shown on hover.
+            custom.append((row.get("sale_id"), round(amount)))
+        traces.append(
+            {
+                "type": "scatter",
+                "x": quantities,
+                "y": profits,
+                "mode": "markers",
+                "marker": {"size": sizes, "opacity": 0.7},
+                "name": category or "Без категории",
+                "customdata": custom,
+                "hovertemplate": SCATTER_HOVER_TEMPLATE,
+            }
         )
+    return {"data": traces, "layout": SCATTER_LAYOUT}
 
-    fig.update_layout(
-        title="Прибыль vs Количество", xaxis_title="Количество", yaxis_title="Прибыль, ₽", dragmode="select"
-    )
-    fig.update_layout(plot_bgcolor=FIGURE_BG_COLOR, paper_bgcolor=FIGURE_BG_COLOR)
-    fig.update_layout(font={"family": DEFAULT_FONT_FAMILY})
-    return fig
+
+def _stratified_sample(
+    groups: dict[str | None, list[dict[str, Any]]],
+    limit: int,
+) -> dict[str | None, list[dict[str, Any]]]:
+    """Evenly thin every group in proportion to its size, keeping at least one point per group."""
+    total = sum(len(rows) for rows in groups.values())
+    sampled: dict[str | None, list[dict[str, Any]]] = {}
+    for key, rows in groups.items():
+        quota = max(1, len(rows) * limit // total)
+        if quota >= len(rows):
+            sampled[key] = rows
+        else:
+            step = len(rows) / quota
+            sampled[key] = [rows[int(position * step)] for position in range(quota)]
+    return sampled
+
+
+AMOUNT_SEPARATOR_TABLE = str.maketrans(",.", " ,")
+_NUMBER_TYPES = (int, float)
 
 
 def _prepare_table_rows(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    prepared: list[dict[str, Any]] = []
-    for row in rows:
-        new_row = dict(row)
-        sale_date = new_row.get("sale_date")
-        if isinstance(sale_date, (date, datetime)):
-            new_row["sale_date"] = sale_date.strftime("%d.%m.%Y")
-
-        total_amount = new_row.get("total_amount")
-        if isinstance(total_amount, (int, float)):
-            formatted = f"{total_amount:,.1f}".replace(",", " ").replace(".", ",")
-            new_row["total_amount"] = formatted
-
-        profit = new_row.get("profit")
-        if isinstance(profit, (int, float)):
-            formatted_profit = f"{profit:,.1f}".replace(",", " ").replace(".", ",")
-            new_row["profit"] = formatted_profit
-
-        prepared.append(new_row)
-    return prepared
-
-
-def _empty_figure(message: str) -> go.Figure:
-    fig = go.Figure()
-    fig.update_layout(
-        annotations=[
-            {
-                "text": message,
-                "xref": "paper",
-                "yref": "paper",
-                "showarrow": False,
-                "font": {"size": 14},
-            }
-        ],
-        xaxis={"visible": False},
-        yaxis={"visible": False},
-        margin={"l": 20, "r": 20, "t": 40, "b": 20},
-    )
-    fig.update_layout(plot_bgcolor=FIGURE_BG_COLOR, paper_bgcolor=FIGURE_BG_COLOR)
-    fig.update_layout(font={"family": DEFAULT_FONT_FAMILY})
-    return fig
+    return [_prepare_table_row(row) for row in rows]
 
 
-def _format_month(value: datetime) -> str:
-    month_map = {
-        1: "янв",
-        2: "фев",
-        3: "мар",
-        4: "апр",
-        5: "май",
-        6: "июн",
-        7: "июл",
-        8: "авг",
-        9: "сен",
-        10: "окт",
-        11: "ноя",
-        12: "дек",
+def _prepare_table_row(row: dict[str, Any]) -> dict[str, Any]:
+    # Only the displayed columns are shipped to the browser.
+    new_row = {column_id: row.get(column_id) for column_id in TABLE_COLUMN_IDS}
+    sale_date = new_row.get("sale_date")
+    if isinstance(sale_date, date):  # datetime is a date subclass
+        new_row["sale_date"] = f"{sale_date.day:02d}.{sale_date.month:02d}.{sale_date.year:04d}"
+
+    total_amount = new_row.get("total_amount")
+    if isinstance(total_amount, _NUMBER_TYPES):
+        new_row["total_amount"] = f"{total_amount:,.1f}".translate(AMOUNT_SEPARATOR_TABLE)
+
+    profit = new_row.get("profit")
+    if isinstance(profit, _NUMBER_TYPES):
+        new_row["profit"] = f"{profit:,.1f}".translate(AMOUNT_SEPARATOR_TABLE)
+    return new_row
+
+
+@lru_cache(maxsize=16)
+def _empty_figure(message: str) -> dict[str, Any]:
+    # Plain dict: the message figures never change, so they are built once and skip go.Figure validation.
+    return {
+        "data": [],
+        "layout": {
+            "annotations": [
+                {
+                    "text": message,
+                    "xref": "paper",
+                    "yref": "paper",
+                    "showarrow": False,
+                    "font": {"size": 14},
+                }
+            ],
+            "xaxis": {"visible": False},
+            "yaxis": {"visible": False},
+            "margin": {"l": 20, "r": 20, "t": 40, "b": 20},
+            **FIGURE_BASE_LAYOUT,
+        },
     }
-    month = month_map.get(value.month, "")
-    return f"{value.day} {month} {value.year}".strip()
+
+
+def _format_month(value: datetime) -> str:
+    return f"{value.day} {MONTH_ABBREVIATIONS[value.month]} {value.year}"
 
 
 add_report(
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
-from typing import Any, Iterable
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Any, Callable, Iterable
 
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from dash import Input, Output, State, dash_table, dcc, html, ctx, no_update
+import plotly.io as pio
+from dash import ALL, ClientsideFunction, Input, Output, State, dash_table, dcc, html, ctx, no_update
 from dash.development.base_component import Component
 
+from app.core.cache import TTLCache
+from app.core.settings import get_settings
 from app.dwh import (
     CategoryActivities,
     ClientActivityDetailRow,
@@ -19,6 +25,12 @@ from .registry import ReportEntry, add_report
 
 logger = logging.getLogger(__name__)
 
+# Department switches tend to go back and forth; identical DWH queries are answered from memory within the TTL.
+# Futures are cached, so a query started by layout() is shared with the callback that needs it.
+_QUERY_CACHE: TTLCache[Future] = TTLCache(maxsize=128, ttl=get_settings().dwh_cache_ttl_seconds)
+_QUERY_LOCK = threading.Lock()
+_QUERY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="client-activities")
+
 FIGURE_BG_COLOR = "rgba(0, 0, 0, 0)"
 SPINNER_COLOR = "#FFFFFF"
 BAR_COLOR_POSITIVE = "#57b26a"
@@ -28,10 +40,14 @@ PANEL_BORDER_RADIUS = "18px"
 MAX_CATEGORIES = 4
 PERIODS = ("day", "week", "quarter")
 PERIOD_LABELS = {"day": "День", "week": "Неделя", "quarter": "Квартал"}
-METRIC_KEYS = [f"{metric}_{period}" for metric in ("issued", "repaid") for period in PERIODS]
 METRIC_LABELS = {"issued": "Выдано", "repaid": "Погашено"}
+TOP_CLIENTS_PER_PERIOD = 5
 ALL_DEPARTMENTS_VALUE = "__all__"
+DETAIL_PAGE_SIZE = 15
+CHART_TYPE = "client-activities-chart"
+CHART_WRAPPER_TYPE = "client-activities-chart-wrapper"
 STORE_DEFAULT = {"categories": []}
+AGGREGATE_OPTIONS = {"limit_per_category": 10, "category_limit": MAX_CATEGORIES}
 
 TAB_STYLE = {
     "backgroundColor": "transparent",
@@ -77,6 +93,10 @@ PANEL_STYLE = {
 }
 
 CHART_HEIGHT = "285px"
+# Shared by every chart in the layout; Dash only serialises these, so one instance is enough.
+GRAPH_CONFIG = {"displayModeBar": False}
+GRAPH_STYLE = {"height": CHART_HEIGHT}
+CHART_WRAPPER_STYLE = {"cursor": "pointer", "height": CHART_HEIGHT}
 
 FILTER_CARD_STYLE = {
     "backgroundColor": "transparent",
@@ -90,6 +110,101 @@ FILTER_CARD_BODY_STYLE = {
     "borderRadius": "22px",
 }
 
+FIGURE_FONT_FAMILY = "Open Sans, Arial, sans-serif"
+HIDDEN_X_AXIS = {"showticklabels": False, "showgrid": False, "zeroline": False}
+# Client names are the y tick labels, pinned to the zero line in the middle of the symmetric x range:
+# issued bars grow right with names on the left, repaid bars grow left with names on the right.
+CLIENT_LABEL_AXIS = {
+    "anchor": "free",
+    "position": 0.5,
+    "autorange": "reversed",
+    "showgrid": False,
+    "showline": False,
+    "zeroline": False,
+    "ticks": "",
+    "ticklabelstandoff": 4,
+    "tickfont": {"size": 9, "family": FIGURE_FONT_FAMILY, "color": "#FFFFFF"},
+}
+
+# Period charts are rendered by assets/client_activities.js; everything stylistic is shipped
+# to the browser once per page through the "client-activities-figure-config" store.
+FIGURE_CONFIG: dict[str, Any] = {
+    "maxCategories": MAX_CATEGORIES,
+    "periods": list(PERIODS),
+    "periodLabels": PERIOD_LABELS,
+    "metricLabels": METRIC_LABELS,
+    "colors": {"issued": BAR_COLOR_POSITIVE, "repaid": BAR_COLOR_NEGATIVE},
+    "messages": {"noCategory": "Нет данных", "noData": "Данные отсутствуют"},
+    "textFont": {"size": 9, "family": FIGURE_FONT_FAMILY, "color": "#FFFFFF"},
+    "periodAnnotation": {
+        "x": 0.5,
+        "y": 1.08,
+        "xref": "paper",
+        "yref": "paper",
+        "showarrow": False,
+        "font": {"color": "#FFFFFF", "size": 16, "family": FIGURE_FONT_FAMILY},
+    },
+    "template": pio.templates[pio.templates.default].to_plotly_json(),
+    "periodLayout": {
+        "bargap": 0.3,
+        "plot_bgcolor": FIGURE_BG_COLOR,
+        "paper_bgcolor": FIGURE_BG_COLOR,
+        "margin": {"l": 8, "r": 8, "t": 36, "b": 12},
+        "showlegend": False,
+        "font": {"family": FIGURE_FONT_FAMILY, "color": "#FFFFFF"},
+        "hoverlabel": {"font": {"family": FIGURE_FONT_FAMILY, "color": "#FFFFFF"}},
+        "title": {"text": ""},
+        "xaxis": {"anchor": "y", "domain": [0.0, 1.0], **HIDDEN_X_AXIS},
+        "yaxis": {"domain": [0.5, 1.0], "side": "left", **CLIENT_LABEL_AXIS},
+        "xaxis2": {"anchor": "y2", "domain": [0.0, 1.0], **HIDDEN_X_AXIS},
+        "yaxis2": {"domain": [0.0, 0.5], "side": "right", **CLIENT_LABEL_AXIS},
+    },
+    "emptyLayout": {
+        "plot_bgcolor": FIGURE_BG_COLOR,
+        "paper_bgcolor": FIGURE_BG_COLOR,
+        "xaxis": {"visible": False},
+        "yaxis": {"visible": False},
+        "margin": {"l": 0, "r": 0, "t": 0, "b": 0},
+    },
+    "emptyAnnotation": {
+        "x": 0.5,
+        "y": 0.5,
+        "xref": "paper",
+        "yref": "paper",
+        "showarrow": False,
+        "font": {"color": "#6e6f7a", "size": 14},
+    },
+}
+
+
+def _cached_query(method: Callable[..., Any], **kwargs: Any) -> Any:
+    """Run a read-only service query, reusing the in-flight or finished result for identical arguments within the TTL."""
+    key = (method, tuple(sorted(kwargs.items())))
+    with _QUERY_LOCK:
+        future = _QUERY_CACHE.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _QUERY_CACHE.set(key, future)
+    if owner:
+        try:
+            future.set_result(method(**kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+    try:
+        return future.result()
+    except Exception:
+        _QUERY_CACHE.pop(key)
+        raise
+
+
+def _prefetch_query(method: Callable[..., Any], **kwargs: Any) -> None:
+    """Start a query in the background unless it is already cached or running."""
+    key = (method, tuple(sorted(kwargs.items())))
+    with _QUERY_LOCK:
+        if _QUERY_CACHE.get(key) is None:
+            _QUERY_CACHE.set(key, _QUERY_POOL.submit(method, **kwargs))
+
 
 def _service_or_none() -> TopClientActivitiesService | None:
     try:
@@ -103,8 +218,11 @@ def layout() -> Component:
     service = _service_or_none()
     departments: list[str] = []
     if service:
+        # The first refresh_categories call asks for all departments; start that aggregation now and
+        # let the callback pick up the running query instead of waiting for it here.
+        _prefetch_query(service.aggregate_client_activities, departments=None, **AGGREGATE_OPTIONS)
         try:
-            departments = service.list_departments()
+            departments = _cached_query(service.list_departments)
         except Exception as exc:  # pragma: no cover - diagnostics only
             logger.exception("Failed to fetch initial client activities metadata: %s", exc)
 
@@ -112,60 +230,13 @@ def layout() -> Component:
                           [{"label": dep, "value": dep} for dep in departments])
     department_value = ALL_DEPARTMENTS_VALUE if department_options else None
 
-    cards: list[dbc.Col] = []
-    for idx in range(MAX_CATEGORIES):
-        period_columns = []
-        for period in PERIODS:
-            graph_id = f"client-activities-chart-{idx}-{period}"
-            wrapper_id = f"{graph_id}-wrapper"
-            period_columns.append(
-                dbc.Col(
-                    html.Div(
-                        dcc.Loading(
-                            dcc.Graph(
-                                id=graph_id,
-                                config={"displayModeBar": False},
-                                style={"height": CHART_HEIGHT},
-                            ),
-                            type="default",
-                            color=SPINNER_COLOR,
-                            className="dash-spinner",
-                        ),
-                        id=wrapper_id,
-                        n_clicks=0,
-                        className="chart-click-wrapper",
-                        style={"cursor": "pointer", "height": CHART_HEIGHT},
-                    ),
-                    xs=12,
-                    md=4,
-                )
-            )
-        cards.append(
-            dbc.Col(
-                html.Div(
-                    [
-                        html.H5(
-                            "—",
-                            id=f"client-activities-card-title-{idx}",
-                            className="panel-title text-center mb-2 text-white",
-                        ),
-                        dbc.Row(period_columns, className="gy-4 gx-2"),
-                    ],
-                    style=PANEL_STYLE,
-                    className="w-100 h-100",
-                    id=f"client-activities-card-inner-{idx}",
-                ),
-                xs=12,
-                lg=6,
-                className="d-flex",
-                id=f"client-activities-card-wrapper-{idx}",
-                style={"display": "none"},
-            )
-        )
+    cards = [_category_card(idx) for idx in range(MAX_CATEGORIES)]
 
     return dbc.Container(
         [
             dcc.Store(id="client-activities-data", data=STORE_DEFAULT),
+            dcc.Store(id="client-activities-data-digest"),
+            dcc.Store(id="client-activities-figure-config", data=FIGURE_CONFIG),
             dcc.Store(id="client-activities-modal-context"),
             html.Div(html.H2("Активность по ТОП 10 клиентам"), className="report-header"),
             dbc.Alert(id="client-activities-feedback", is_open=False, color="info", className="mt-3"),
@@ -195,10 +266,10 @@ def layout() -> Component:
                         ],
                         className="gy-3",
                     ),
-                    style=FILTER_CARD_BODY_STYLE.copy(),
+                    style=FILTER_CARD_BODY_STYLE,
                 ),
                 className="mt-2 filter-card",
-                style=FILTER_CARD_STYLE.copy(),
+                style=FILTER_CARD_STYLE,
             ),
             dbc.Row(cards, className="gy-4 mt-2"),
             dbc.Modal(
@@ -235,7 +306,10 @@ def layout() -> Component:
                                     id="client-activities-detail-table",
                                     data=[],
                                     columns=DETAIL_COLUMNS,
-                                    page_size=15,
+                                    page_action="custom",
+                                    page_current=0,
+                                    page_count=1,
+                                    page_size=DETAIL_PAGE_SIZE,
                                     style_table={
                                         "overflowX": "auto",
                                         "backgroundColor": "transparent",
@@ -302,90 +376,118 @@ def layout() -> Component:
     )
 
 
+def _period_column(idx: int, period: str) -> dbc.Col:
+    return dbc.Col(
+        html.Div(
+            dcc.Loading(
+                dcc.Graph(
+                    id={"type": CHART_TYPE, "idx": idx, "period": period},
+                    config=GRAPH_CONFIG,
+                    style=GRAPH_STYLE,
+                ),
+                type="default",
+                color=SPINNER_COLOR,
+                className="dash-spinner",
+            ),
+            id={"type": CHART_WRAPPER_TYPE, "idx": idx, "period": period},
+            n_clicks=0,
+            className="chart-click-wrapper",
+            style=CHART_WRAPPER_STYLE,
+        ),
+        xs=12,
+        md=4,
+    )
+
+
+def _category_card(idx: int) -> dbc.Col:
+    return dbc.Col(
+        html.Div(
+            [
+                html.H5(
+                    "—",
+                    id=f"client-activities-card-title-{idx}",
+                    className="panel-title text-center mb-2 text-white",
+                ),
+                dbc.Row([_period_column(idx, period) for period in PERIODS], className="gy-4 gx-2"),
+            ],
+            style=PANEL_STYLE,
+            className="w-100 h-100",
+            id=f"client-activities-card-inner-{idx}",
+        ),
+        xs=12,
+        lg=6,
+        className="d-flex",
+        id=f"client-activities-card-wrapper-{idx}",
+        style={"display": "none"},
+    )
+
+
 def register_callbacks(app) -> None:
     @app.callback(
         Output("client-activities-data", "data"),
+        Output("client-activities-data-digest", "data"),
         Output("client-activities-feedback", "children"),
         Output("client-activities-feedback", "color"),
         Output("client-activities-feedback", "is_open"),
         *[Output(f"client-activities-card-title-{idx}", "children") for idx in range(MAX_CATEGORIES)],
         *[Output(f"client-activities-card-wrapper-{idx}", "style") for idx in range(MAX_CATEGORIES)],
         Input("client-activities-department-filter", "value"),
+        State("client-activities-data-digest", "data"),
     )
-    def refresh_categories(department_value):
+    def refresh_categories(department_value, previous_digest):
         service = _service_or_none()
         titles = ["—"] * MAX_CATEGORIES
         styles = [{"display": "none"} for _ in range(MAX_CATEGORIES)]
         if not service:
             message = "Источник данных не настроен. Укажите DWH_DB_DSN."
-            return STORE_DEFAULT, message, "warning", True, *titles, *styles
+            return STORE_DEFAULT, None, message, "warning", True, *titles, *styles
 
-        departments = _deserialize_departments(department_value)
+        departments = _department_tuple(department_value)
         try:
-            categories = service.aggregate_client_activities(
-                departments=departments,
-                limit_per_category=10,
-                category_limit=MAX_CATEGORIES,
+            categories = _cached_query(
+                service.aggregate_client_activities, departments=departments, **AGGREGATE_OPTIONS
             )
         except Exception as exc:  # pragma: no cover - runtime diagnostics only
             logger.exception("Failed to load client activity data: %s", exc)
             message = "Не удалось загрузить данные. Проверьте соединение с DWH."
-            return STORE_DEFAULT, message, "danger", True, *titles, *styles
+            return STORE_DEFAULT, None, message, "danger", True, *titles, *styles
 
         if not categories:
             message = "Данные отсутствуют для выбранных фильтров."
-            return STORE_DEFAULT, message, "secondary", True, *titles, *styles
+            return STORE_DEFAULT, None, message, "secondary", True, *titles, *styles
 
         store_data = _serialize_categories(categories)
+        digest = _store_digest(store_data)
+        if digest == previous_digest:
+            # Same charts as already on screen: leave the store alone so nothing downstream re-renders.
+            return no_update, no_update, "", "info", False, *([no_update] * (2 * MAX_CATEGORIES))
         for idx, entry in enumerate(store_data.get("categories", [])):
             if idx >= MAX_CATEGORIES:
                 break
             titles[idx] = _format_category_title(entry.get("name"))
             styles[idx] = {}
-        return store_data, "", "info", False, *titles, *styles
+        return store_data, digest, "", "info", False, *titles, *styles
 
-    @app.callback(
-        *[
-            Output(f"client-activities-chart-{idx}-{period}", "figure")
-            for idx in range(MAX_CATEGORIES)
-            for period in PERIODS
-        ],
+    # Charts are matched in layout order (category, then period), which is the order render() returns them in.
+    app.clientside_callback(
+        ClientsideFunction(namespace="client_activities", function_name="render"),
+        Output({"type": CHART_TYPE, "idx": ALL, "period": ALL}, "figure"),
         Input("client-activities-data", "data"),
+        State("client-activities-figure-config", "data"),
     )
-    def render_figures(store_data):
-        categories = store_data.get("categories") if isinstance(store_data, dict) else []
-        outputs: list[go.Figure] = []
-        for idx in range(MAX_CATEGORIES):
-            category_entry = categories[idx] if isinstance(categories, list) and idx < len(categories) else None
-            for period in PERIODS:
-                if category_entry:
-                    max_value = _max_category_magnitude(category_entry)
-                    figure = _build_period_figure(category_entry, period, max_value)
-                else:
-                    figure = _empty_figure("Нет данных")
-                outputs.append(figure)
-        return outputs
-
-    wrapper_inputs = [
-        Input(f"client-activities-chart-{idx}-{period}-wrapper", "n_clicks_timestamp")
-        for idx in range(MAX_CATEGORIES)
-        for period in PERIODS
-    ]
 
     @app.callback(
         Output("client-activities-detail-modal", "is_open"),
     Output("client-activities-detail-title", "children"),
     Output("client-activities-detail-tabs", "value"),
         Output("client-activities-modal-context", "data"),
-        *wrapper_inputs,
+        Input({"type": CHART_WRAPPER_TYPE, "idx": ALL, "period": ALL}, "n_clicks_timestamp"),
         Input("client-activities-modal-close", "n_clicks"),
         State("client-activities-detail-modal", "is_open"),
         State("client-activities-data", "data"),
         prevent_initial_call=True,
     )
-    def toggle_modal(*args):
-        *_timestamps, _close_clicks, _is_open, store_data = args
-
+    def toggle_modal(_timestamps, _close_clicks, _is_open, store_data):
         triggered = ctx.triggered_id
         if triggered == "client-activities-modal-close":
             return False, no_update, "issued", None
@@ -409,282 +511,99 @@ def register_callbacks(app) -> None:
 
     @app.callback(
         Output("client-activities-detail-table", "data"),
+        Output("client-activities-detail-table", "page_count"),
+        Output("client-activities-detail-table", "page_current"),
         Input("client-activities-modal-context", "data"),
-    Input("client-activities-detail-tabs", "value"),
+        Input("client-activities-detail-tabs", "value"),
+        Input("client-activities-detail-table", "page_current"),
         State("client-activities-department-filter", "value"),
         prevent_initial_call=True,
     )
-    def update_detail_table(context_data, metric_value, department_value):
+    def update_detail_table(context_data, metric_value, page_current, department_value):
         if not context_data or not metric_value:
-            return []
+            return [], 1, 0
 
         category = context_data.get("category")
         period = context_data.get("period")
         if not (isinstance(category, str) and isinstance(period, str)):
-            return []
+            return [], 1, 0
 
         service = _service_or_none()
         if not service:
-            return []
-
-        departments = _deserialize_departments(department_value)
+            return [], 1, 0
+
+        # Paging keeps the page count computed when the chart or tab was selected.
+        paging = "client-activities-detail-table.page_current" in ctx.triggered_prop_ids
+        page = (page_current or 0) if paging else 0
+        query = {
+            "category": category,
+            "client": None,
+            "metric": metric_value,
+            "period": period,
+            "departments": _department_tuple(department_value),
+        }
         try:
-            details = service.fetch_details(
-                category=category,
-                client=None,
-                metric=metric_value,
-                period=period,
-                departments=departments,
-                limit=500,
+            page_count = no_update
+            if not paging:
+                page_count = max(1, -(-_cached_query(service.count_details, **query) // DETAIL_PAGE_SIZE))
+            details = _cached_query(
+                service.fetch_details, **query, limit=DETAIL_PAGE_SIZE, offset=page * DETAIL_PAGE_SIZE
             )
         except Exception as exc:  # pragma: no cover - runtime diagnostics only
             logger.exception("Failed to load client activity details: %s", exc)
-            return []
+            return [], 1, 0
+
+        return _prepare_detail_rows(details), page_count, page
+
 
-        return _prepare_detail_rows(details)
+def _store_digest(store_data: dict[str, Any]) -> str:
+    payload = json.dumps(store_data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
 
 
 def _serialize_categories(categories: Iterable[CategoryActivities]) -> dict[str, Any]:
+    """Ship only what the charts draw: per-period top clients with their bar labels, and the shared axis limit."""
     prepared: list[dict[str, Any]] = []
     for category in categories:
-        clients: list[dict[str, Any]] = []
-        for client in category.clients:
-            clients.append(
-                {
-                    "client": client.client,
-                    "issued_day": client.issued_day,
-                    "repaid_day": client.repaid_day,
-                    "issued_week": client.issued_week,
-                    "repaid_week": client.repaid_week,
-                    "issued_quarter": client.issued_quarter,
-                    "repaid_quarter": client.repaid_quarter,
+        periods: dict[str, dict[str, dict[str, list[Any]]]] = {}
+        max_value = 0.0
+        for period in PERIODS:
+            periods[period] = {}
+            for metric in METRIC_LABELS:
+                key = f"{metric}_{period}"
+                # Bars are labelled to two decimals, so more precision only inflates the store.
+                values = [(client.client, round(float(getattr(client, key) or 0.0), 2)) for client in category.clients]
+                max_value = max(max_value, *(abs(value) for _, value in values), 0.0)
+                top = sorted((item for item in values if item[1] > 0), key=itemgetter(1), reverse=True)
+                top = top[:TOP_CLIENTS_PER_PERIOD]
+                # Columnar so each list maps straight onto a bar trace's y / x / text arrays.
+                periods[period][metric] = {
+                    "clients": [client for client, _ in top],
+                    "values": [value for _, value in top],
+                    "text": [_format_number(value) for _, value in top],
                 }
-            )
-        prepared.append({"name": category.category, "clients": clients, "score": category.score})
+        prepared.append({"name": category.category, "max": max_value, "periods": periods})
     return {"categories": prepared}
 
 
-def _max_category_magnitude(category_entry: dict[str, Any]) -> float:
-    clients = category_entry.get("clients") if isinstance(category_entry, dict) else []
-    if not isinstance(clients, list):
-        return 0.0
-    max_value = 0.0
-    for client in clients:
-        if not isinstance(client, dict):
-            continue
-        for key in METRIC_KEYS:
-            value = client.get(key)
-            try:
-                numeric = abs(float(value))
-            except (TypeError, ValueError):
-                continue
-            if numeric > max_value:
-                max_value = numeric
-    return max_value
-
-
-
-def _build_period_figure(category_entry: dict[str, Any], period: str, max_abs_value: float | None = None) -> go.Figure:
-    clients = category_entry.get("clients") if isinstance(category_entry, dict) else []
-    if not isinstance(clients, list):
-        return _empty_figure("Нет данных")
-
-    issued_key = f"issued_{period}"
-    repaid_key = f"repaid_{period}"
-
-    positive = [row for row in clients if row.get(issued_key, 0) > 0]
-    negative = [row for row in clients if row.get(repaid_key, 0) > 0]
-
-    positive.sort(key=lambda row: row.get(issued_key, 0), reverse=True)
-    negative.sort(key=lambda row: row.get(repaid_key, 0), reverse=True)
-
-    positive = positive[:5]
-    negative = negative[:5]
-
-    if not positive and not negative:
-        return _empty_figure("Данные отсутствуют")
-
-    y_positive: list[str] = [row.get("client") for row in positive]
-    x_positive: list[float] = [row.get(issued_key, 0) for row in positive]
-    custom_positive: list[Any] = [
-        {"category": category_entry.get("name"), "client": row.get("client"), "period": period, "metric": "issued"}
-        for row in positive
-    ]
-
-    y_negative: list[str] = [row.get("client") for row in negative]
-    x_negative: list[float] = [-row.get(repaid_key, 0) for row in negative]
-    custom_negative: list[Any] = [
-        {"category": category_entry.get("name"), "client": row.get("client"), "period": period, "metric": "repaid"}
-        for row in negative
-    ]
-
-    max_positive = max(x_positive) if x_positive else 0
-    max_negative = max(abs(value) for value in x_negative) if x_negative else 0
-    local_limit = max(max_positive, max_negative)
-    if max_abs_value is not None and max_abs_value > 0:
-        x_limit = max_abs_value
-    else:
-        x_limit = local_limit if local_limit > 0 else 1
-
-    positive_text = [_format_number(value) for value in x_positive]
-    negative_abs = [abs(value) for value in x_negative]
-    negative_text = [_format_number(value) for value in negative_abs]
-
-    fig = make_subplots(rows=2, cols=1, shared_xaxes=False, vertical_spacing=0)
-
-    fig.add_trace(
-        go.Bar(
-            x=x_positive,
-            y=y_positive,
-            orientation="h",
-            name="Выдано",
-            marker_color=BAR_COLOR_POSITIVE,
-            customdata=custom_positive,
-            text=positive_text,
-            hovertemplate="Клиент: %{y}<br>Выдано: %{text} млн руб.<extra></extra>",
-            width=0.7,
-        ),
-        row=1,
-        col=1,
-    )
-    fig.add_trace(
-        go.Bar(
-            x=x_negative,
-            y=y_negative,
-            orientation="h",
-            name="Погашено",
-            marker_color=BAR_COLOR_NEGATIVE,
-            customdata=custom_negative,
-            text=negative_text,
-            hovertemplate="Клиент: %{y}<br>Погашено: %{text} млн руб.<extra></extra>",
-            width=0.7,
-        ),
-        row=2,
-        col=1,
-    )
-
-    fig.update_layout(
-        bargap=0.3,
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        margin={"l": 8, "r": 8, "t": 36, "b": 12},
-        showlegend=False,
-        font=dict(family="Open Sans, Arial, sans-serif", color="#FFFFFF"),
-        hoverlabel=dict(font=dict(family="Open Sans, Arial, sans-serif", color="#FFFFFF")),
-    )
-
-    fig.update_traces(textfont={"size": 9, "family": "Open Sans, Arial, sans-serif", "color": "#FFFFFF"})
-
-    x_range = [-x_limit * 1.05, x_limit * 1.05]
-    fig.update_xaxes(
-        range=x_range,
-        showticklabels=False,
-        showgrid=False,
-        zeroline=False,
-        row=1,
-        col=1,
-    )
-    fig.update_xaxes(
-        range=x_range,
-        showticklabels=False,
-        showgrid=False,
-        zeroline=False,
-        row=2,
-        col=1,
-    )
-
-    fig.update_yaxes(
-        autorange="reversed",
-        visible=False,
-        row=1,
-        col=1,
-    )
-    fig.update_yaxes(
-        autorange="reversed",
-        visible=False,
-        row=2,
-        col=1,
-    )
-
-    for label in y_positive:
-        fig.add_annotation(
-            x=0,
-            y=label,
-            xref="x1",
-            yref="y1",
-            text=label,
-            showarrow=False,
-            xanchor="right",
-            xshift=-4,
-            align="right",
-            font=dict(size=9, family="Open Sans, Arial, sans-serif", color="#FFFFFF"),
-        )
-
-    for label in y_negative:
-        fig.add_annotation(
-            x=0,
-            y=label,
-            xref="x2",
-            yref="y2",
-            text=label,
-            showarrow=False,
-            xanchor="left",
-            xshift=4,
-            align="left",
-            font=dict(size=9, family="Open Sans, Arial, sans-serif", color="#FFFFFF"),
-        )
-
-    period_label = PERIOD_LABELS.get(period, period.title())
-    if period_label:
-        fig.add_annotation(
-            text=period_label,
-            x=0.5,
-            y=1.08,
-            xref="paper",
-            yref="paper",
-            showarrow=False,
-            font=dict(color="#FFFFFF", size=16, family="Open Sans, Arial, sans-serif"),
-        )
-    fig.update_layout(title=dict(text=""))
-
-    return fig
-
-
-def _empty_figure(message: str) -> go.Figure:
-    fig = go.Figure()
-    fig.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        annotations=[
-            dict(
-                text=message,
-                x=0.5,
-                y=0.5,
-                xref="paper",
-                yref="paper",
-                showarrow=False,
-                font=dict(color="#6e6f7a", size=14),
-            )
-        ],
-        margin={"l": 0, "r": 0, "t": 0, "b": 0},
-    )
-    return fig
-
-
 def _deserialize_departments(value: Any) -> list[str] | None:
-    if value in (None, ALL_DEPARTMENTS_VALUE):
+    # Dash dropdowns only ever send a string or a list; anything else means "all departments".
+    if value is None or value == ALL_DEPARTMENTS_VALUE:
         return None
     if isinstance(value, str):
         value = value.strip()
         return [value] if value else None
-    if isinstance(value, Iterable):
-        items = [str(item).strip() for item in value if item not in (None, ALL_DEPARTMENTS_VALUE)]
-        return items or None
+    if isinstance(value, (list, tuple)):
+        items = [str(item).strip() for item in value if item is not None and item != ALL_DEPARTMENTS_VALUE]
+        return [item for item in items if item] or None
     return None
 
 
+def _department_tuple(value: Any) -> tuple[str, ...] | None:
+    departments = _deserialize_departments(value)
+    return tuple(departments) if departments else None
+
+
 def _prepare_detail_rows(rows: Iterable[ClientActivityDetailRow]) -> list[dict[str, Any]]:
     prepared: list[dict[str, Any]] = []
     for row in rows:
@@ -718,21 +637,11 @@ def _prepare_detail_rows(rows: Iterable[ClientActivityDetailRow]) -> list[dict[s
 
 
 def _parse_chart_wrapper(component_id: Any) -> tuple[int, str] | None:
-    if not isinstance(component_id, str):
+    if not isinstance(component_id, dict) or component_id.get("type") != CHART_WRAPPER_TYPE:
         return None
-    if not component_id.startswith("client-activities-chart-") or not component_id.endswith("-wrapper"):
-        return None
-    trimmed = component_id[len("client-activities-chart-") : -len("-wrapper")]
-    parts = trimmed.split("-")
-    if len(parts) < 2:
-        return None
-    idx_str = parts[0]
-    period = "-".join(parts[1:])
-    try:
-        idx = int(idx_str)
-    except (TypeError, ValueError):
-        return None
-    if period not in PERIODS:
+    idx = component_id.get("idx")
+    period = component_id.get("period")
+    if not isinstance(idx, int) or period not in PERIODS:
         return None
     return idx, period
 
@@ -743,12 +652,15 @@ def _build_period_title(category_entry: dict[str, Any], period: str) -> str:
     return f"{category} — {period_label}"
 
 
+AMOUNT_SEPARATOR_TABLE = str.maketrans(",.", " ,")
+
+
 def _format_number(value: Any) -> str:
     try:
         number = float(value)
     except (TypeError, ValueError):  # pragma: no cover - defensive fallback
         return "0"
-    return f"{number:,.2f}".replace(",", " ").replace(".", ",")
+    return f"{number:,.2f}".translate(AMOUNT_SEPARATOR_TABLE)
 
 
 def _format_category_title(raw: Any) -> str:
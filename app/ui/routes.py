@@ -1,35 +1,154 @@
 from __future__ import annotations
 
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
+
 import dash_bootstrap_components as dbc
-from dash import Dash, Input, Output, html, no_update
+from dash import ClientsideFunction, Dash, Input, Output, State, html, no_update
 from dash.exceptions import PreventUpdate
-from flask import session as flask_session, request
+from flask import has_request_context, request, session as flask_session
 
 from app.auth.service import AuthService
 from app.core.settings import get_settings
 from app.ui import reports
-from app.ui.layout import (
-    DEFAULT_APP_STYLE,
-    DEFAULT_FRAME_STYLE,
-    DEFAULT_NAVBAR_STYLE,
-    NAVBAR_TEXT_COLOR,
-)
+from app.ui.layout import DEFAULT_FRAME_STYLE, LOGIN_ROUTE, PUBLIC_ROUTES, get_layout
 from app.ui.pages import admin, common, library, login
 
 
-def _has_permission(session_data: dict, resource: str, action: str = "read") -> bool:
-    permissions = session_data.get("permissions") or {}
-    if "*" in permissions and action in permissions["*"]:
+@dataclass(frozen=True, slots=True)
+class SessionSnapshot:
+    """The session fields page routing needs, read once per navigation."""
+
+    user_id: Any
+    display_name: str | None
+    permissions: Mapping[str, Any]
+    report_codes: frozenset[str]
+    roles: tuple[str, ...]
+    is_admin: bool
+
+
+# Page handlers return the page and its frame style, or None for the default frame.
+PageResult = tuple[Any, Mapping[str, str] | None]
+PageHandler = Callable[["SessionSnapshot", str], PageResult]
+
+
+def _has_permission(permissions: Mapping[str, Any], resource: str, action: str = "read") -> bool:
+    if action in (permissions.get("*") or ()):
         return True
-    allowed = permissions.get(resource) or []
-    return action in allowed
+    return action in (permissions.get(resource) or ())
+
+
+def _session_snapshot(session: Mapping[str, Any]) -> SessionSnapshot:
+    permissions = session.get("permissions")
+    if not isinstance(permissions, Mapping):
+        permissions = {}
+    roles = session.get("roles") or ()
+    if isinstance(roles, str):
+        roles = (roles,)
+    roles = tuple(sorted(str(role) for role in roles))
+    reports_data = session.get("reports") or ()
+    return SessionSnapshot(
+        user_id=session.get("user_id"),
+        display_name=session.get("full_name") or session.get("username"),
+        permissions=permissions,
+        report_codes=frozenset(
+            report["code"] for report in reports_data if isinstance(report, dict) and report.get("code")
+        ),
+        roles=roles,
+        is_admin="admin" in roles or _has_permission(permissions, "admin", "read"),
+    )
+
+
+def _permissions_payload(snapshot: SessionSnapshot) -> dict[str, bool]:
+    return {"authenticated": bool(snapshot.user_id), "admin": snapshot.is_admin}
+
+
+def _identity_hash(snapshot: SessionSnapshot) -> str:
+    identity = repr((snapshot.user_id, snapshot.roles, snapshot.is_admin))
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _user_display(snapshot: SessionSnapshot) -> list[Any]:
+    return [
+        html.Span(snapshot.display_name, className="text-white"),
+        dbc.Button("Выйти", id="logout-button", color="outline-light", size="sm"),
+    ]
+
+
+def _library_route(snapshot: SessionSnapshot, pathname: str) -> PageResult:
+    return library.layout(flask_session), None
+
+
+def _admin_route(snapshot: SessionSnapshot, pathname: str) -> PageResult:
+    return (admin.layout() if snapshot.is_admin else common.unauthorized_layout()), None
+
+
+def _not_found_route(snapshot: SessionSnapshot, pathname: str) -> PageResult:
+    return common.not_found_layout(pathname), None
+
+
+def _access_check(resource: str | None, code: str | None) -> Callable[[SessionSnapshot], bool]:
+    """Non-admin access predicate specialised for what the report entry declares."""
+    if resource and code:
+        return lambda snapshot: _has_permission(snapshot.permissions, resource, "read") or code in snapshot.report_codes
+    if resource:
+        return lambda snapshot: _has_permission(snapshot.permissions, resource, "read")
+    if code:
+        return lambda snapshot: code in snapshot.report_codes
+    return lambda snapshot: False
+
+
+def _report_route(entry: reports.ReportEntry) -> PageHandler:
+    layout = entry.layout
+    frame_style = {**DEFAULT_FRAME_STYLE, **entry.frame_style} if entry.frame_style else None
+    can_access = _access_check(entry.permission_resource, entry.code)
+
+    def handler(snapshot: SessionSnapshot, pathname: str) -> PageResult:
+        if not (snapshot.is_admin or can_access(snapshot)):
+            return common.unauthorized_layout(), None
+        return layout(), frame_style
+
+    return handler
 
 
-def _can_view_report(session_data: dict, report_code: str) -> bool:
-    reports = session_data.get("reports") or []
-    if not reports:
-        return False
-    return any(isinstance(report, dict) and report.get("code") == report_code for report in reports)
+def _login_redirect(pathname: str, perms: Mapping[str, Any] | None) -> Any:
+    """Where to send a visitor without a server session.
+
+    perms-store is rendered with the page, so it still says "authenticated" after a logout
+    elsewhere or a session expiry; reloading through /login rebuilds the shell for a guest.
+    """
+    if (perms and perms.get("authenticated")) or pathname not in PUBLIC_ROUTES:
+        return LOGIN_ROUTE
+    return no_update
+
+
+def _frame_style(style: Mapping[str, str] | None, current: Mapping[str, str] | None) -> Any:
+    style = style or DEFAULT_FRAME_STYLE
+    return no_update if style == current else style
+
+
+# "/login" renders the library for signed-in users; assets/routes.js redirects them to /library.
+_STATIC_ROUTES: dict[str, PageHandler] = {
+    "/": _library_route,
+    "/library": _library_route,
+    "/admin": _admin_route,
+    "/login": _library_route,
+}
+
+
+def serve_layout():
+    """Build the app shell with the current user's navbar and permissions baked in."""
+    if not has_request_context():
+        return get_layout()
+    snapshot = _session_snapshot(flask_session)
+    if not snapshot.user_id:
+        return get_layout()
+    return get_layout(
+        permissions=_permissions_payload(snapshot),
+        user_display=_user_display(snapshot),
+        identity=_identity_hash(snapshot),
+    )
 
 
 def register_routes(app: Dash) -> None:
@@ -38,188 +157,64 @@ def register_routes(app: Dash) -> None:
     login.register_callbacks(app)
     reports.register_all_callbacks(app)
     admin.register_callbacks(app)
-    auth_service = AuthService()
-
-    @app.callback(
-        Output("page-content", "children"),
-        Output("navbar-user", "children"),
+    # Bound once per app: settings are cached and the service holds no per-request state.
+    logout = AuthService().logout
+    session_cookie_name = get_settings().session_cookie_name
+
+    # Report modules register themselves on import, so the route table is built once.
+    route_table: dict[str, PageHandler] = {entry.route: _report_route(entry) for entry in reports.iter_reports()}
+    route_table.update(_STATIC_ROUTES)
+    resolve_route = route_table.get
+
+    # The navbar depends only on who is signed in, so it is styled once per identity, not per URL.
+    app.clientside_callback(
+        ClientsideFunction("routes", "toggleNav"),
         Output("nav-links", "style"),
         Output("nav-admin", "style"),
         Output("nav-admin", "disabled"),
         Output("nav-library", "style"),
         Output("nav-library", "disabled"),
+        Input("identity-hash", "data"),
+        State("perms-store", "data"),
+        State("nav-config", "data"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction("routes", "redirect"),
         Output("global-redirect", "pathname", allow_duplicate=True),
-        Output("app-root", "style"),
-        Output("main-navbar", "style"),
-        Output("page-frame", "style"),
         Input("url", "pathname"),
+        State("perms-store", "data"),
+        State("nav-config", "data"),
         prevent_initial_call="initial_duplicate",
     )
-    def render_page(pathname: str | None):
-        pathname = pathname or "/"
 
-        app_style = DEFAULT_APP_STYLE.copy()
-        navbar_style = DEFAULT_NAVBAR_STYLE.copy()
-        frame_style = DEFAULT_FRAME_STYLE.copy()
-
-        session_data = dict(flask_session)
-        user_id = session_data.get("user_id")
-
-        nav_links_style = {"display": "none"}
-        nav_admin_style = {"display": "none", "color": NAVBAR_TEXT_COLOR}
-        nav_admin_disabled = True
-        nav_library_style = {"display": "none"}
-        nav_library_disabled = True
-
-        if not user_id:
-            layout = login.layout()
-            redirect = no_update
-            if pathname not in ("/", "/login"):
-                redirect = "/login"
-            return (
-                layout,
-                [],
-                nav_links_style,
-                nav_admin_style,
-                nav_admin_disabled,
-                nav_library_style,
-                nav_library_disabled,
-                redirect,
-                app_style,
-                navbar_style,
-                frame_style,
-            )
-
-        user_display = [
-            html.Span(session_data.get("full_name") or session_data.get("username"), className="text-white"),
-            dbc.Button("Выйти", id="logout-button", color="outline-light", size="sm"),
-        ]
-
-        nav_links_style = {"display": "flex", "alignItems": "center", "gap": "0.75rem"}
-        nav_library_style = {"color": NAVBAR_TEXT_COLOR}
-        nav_library_disabled = False
-
-        admin_disabled = not (
-            "admin" in (session_data.get("roles") or [])
-            or _has_permission(session_data, "admin", "read")
-        )
-        nav_admin_style = {"color": NAVBAR_TEXT_COLOR} if not admin_disabled else {"display": "none", "color": NAVBAR_TEXT_COLOR}
-        nav_admin_disabled = admin_disabled
-
-        def _can_access_report_entry(entry) -> bool:
-            if not admin_disabled:
-                return True
-            if entry.permission_resource and _has_permission(session_data, entry.permission_resource, "read"):
-                return True
-            if entry.code and _can_view_report(session_data, entry.code):
-                return True
-            return False
-
-        if pathname in ("/", "/library"):
-            return (
-                library.layout(session_data),
-                user_display,
-                nav_links_style,
-                nav_admin_style,
-                nav_admin_disabled,
-                nav_library_style,
-                nav_library_disabled,
-                no_update,
-                app_style,
-                navbar_style,
-                frame_style,
-            )
-
-        report_entry = reports.get_report(pathname)
-        if report_entry:
-            if not _can_access_report_entry(report_entry):
-                return (
-                    common.unauthorized_layout(),
-                    user_display,
-                    nav_links_style,
-                    nav_admin_style,
-                    nav_admin_disabled,
-                    nav_library_style,
-                    nav_library_disabled,
-                    no_update,
-                    app_style,
-                    navbar_style,
-                    frame_style,
-                )
-            if report_entry.route == "/reports/deal-funnel":
-                frame_style = frame_style.copy()
-                frame_style.update({"maxWidth": "100%", "width": "100%"})
-            return (
-                report_entry.layout(),
-                user_display,
-                nav_links_style,
-                nav_admin_style,
-                nav_admin_disabled,
-                nav_library_style,
-                nav_library_disabled,
-                no_update,
-                app_style,
-                navbar_style,
-                frame_style,
-            )
-
-        if pathname == "/admin":
-            if admin_disabled:
-                return (
-                    common.unauthorized_layout(),
-                    user_display,
-                    nav_links_style,
-                    nav_admin_style,
-                    nav_admin_disabled,
-                    nav_library_style,
-                    nav_library_disabled,
-                    no_update,
-                    app_style,
-                    navbar_style,
-                    frame_style,
-                )
-            return (
-                admin.layout(),
-                user_display,
-                nav_links_style,
-                nav_admin_style,
-                nav_admin_disabled,
-                nav_library_style,
-                nav_library_disabled,
-                no_update,
-                app_style,
-                navbar_style,
-                frame_style,
-            )
-
-        if pathname == "/login":
-            return (
-                library.layout(session_data),
-                user_display,
-                nav_links_style,
-                nav_admin_style,
-                nav_admin_disabled,
-                nav_library_style,
-                nav_library_disabled,
-                "/library",
-                app_style,
-                navbar_style,
-                frame_style,
-            )
-
-        return (
-            common.not_found_layout(pathname),
-            user_display,
-            nav_links_style,
-            nav_admin_style,
-            nav_admin_disabled,
-            nav_library_style,
-            nav_library_disabled,
-            no_update,
-            app_style,
-            navbar_style,
-            frame_style,
-        )
+    app.clientside_callback(
+        ClientsideFunction("routes", "trackPath"),
+        Output("last-path", "data"),
+        Input("url", "pathname"),
+        State("last-path", "data"),
+    )
+
+    @app.callback(
+        Output("page-content", "children"),
+        Output("page-frame", "style"),
+        Output("global-redirect", "pathname", allow_duplicate=True),
+        Input("last-path", "data"),
+        State("page-frame", "style"),
+        State("perms-store", "data"),
+        prevent_initial_call=True,
+    )
+    def render_page(
+        pathname: str | None,
+        current_frame_style: dict[str, str] | None,
+        perms: dict[str, bool] | None,
+    ):
+        pathname = pathname or "/"
+        snapshot = _session_snapshot(flask_session)
+        if not snapshot.user_id:
+            return login.layout(), _frame_style(None, current_frame_style), _login_redirect(pathname, perms)
+        page, frame_style = resolve_route(pathname, _not_found_route)(snapshot, pathname)
+        return page, _frame_style(frame_style, current_frame_style), no_update
 
     @app.callback(
         Output("global-redirect", "pathname", allow_duplicate=True),
@@ -230,8 +225,8 @@ def register_routes(app: Dash) -> None:
         if not n_clicks:
             raise PreventUpdate
 
-        session_token = request.cookies.get(get_settings().session_cookie_name)
+        session_token = request.cookies.get(session_cookie_name)
         if session_token:
-            auth_service.logout(session_token, reason="logout")
+            logout(session_token, reason="logout")
         flask_session.clear()
         return "/login"  # type: ignore[return-value]
@@ -10,6 +10,23 @@ class DealDropdown(Component):
     _base_nodes = ["children"]
     _namespace = "deal_dropdown"
     _type = "DealDropdown"
+    # Shared by every instance; Dash only reads these.
+    _prop_names: tuple[str, ...] = (
+        "options",
+        "value",
+        "multi",
+        "placeholder",
+        "disabled",
+        "searchable",
+        "clearable",
+        "style",
+        "className",
+        "id",
+        "loading_state",
+    )
+    _valid_wildcard_attributes: tuple[str, ...] = ()
+    available_properties = _prop_names
+    available_wildcard_properties: tuple[str, ...] = ()
 
     @_explicitize_args
     def __init__(
@@ -27,25 +44,20 @@ class DealDropdown(Component):
         loading_state=Component.UNDEFINED,
         **kwargs,
     ):
-        self._prop_names = [
-            "options",
-            "value",
-            "multi",
-            "placeholder",
-            "disabled",
-            "searchable",
-            "clearable",
-            "style",
-            "className",
-            "id",
-            "loading_state",
-        ]
-        self._valid_wildcard_attributes: list[str] = []
-        self.available_properties = self._prop_names.copy()
-        self.available_wildcard_properties: list[str] = []
         _explicit_args = kwargs.pop("_explicit_args")
-        _locals = locals()
-        _locals.update(kwargs)
-        args = {k: _locals[k] for k in _explicit_args}
+        named = {
+            "options": options,
+            "value": value,
+            "multi": multi,
+            "placeholder": placeholder,
+            "disabled": disabled,
+            "searchable": searchable,
+            "clearable": clearable,
+            "style": style,
+            "className": className,
+            "id": id,
+            "loading_state": loading_state,
+        }
+        args = {k: named[k] if k in named else kwargs[k] for k in _explicit_args}
 
         super().__init__(**args)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.dialects.sqlite.base import SQLiteTypeCompiler
+from sqlalchemy.orm import Session as SASession, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+
+
+def _patch_sqlite_dialect() -> None:
+    """Teach SQLite the PostgreSQL-only column types and defaults used by the models."""
+    if not hasattr(SQLiteTypeCompiler, "visit_JSONB"):
+        def _visit_jsonb(self, type_, **kw):  # type: ignore[override]
+            return "TEXT"
+
+        SQLiteTypeCompiler.visit_JSONB = _visit_jsonb  # type: ignore[attr-defined]
+
+    if not hasattr(SQLiteTypeCompiler, "visit_INET"):
+        def _visit_inet(self, type_, **kw):  # type: ignore[override]
+            return "TEXT"
+
+        SQLiteTypeCompiler.visit_INET = _visit_inet  # type: ignore[attr-defined]
+
+    for table in Base.metadata.tables.values():
+        for column in table.columns:
+            default = column.server_default
+            if default is None:
+                continue
+            default_sql = str(getattr(default, "arg", default))
+            if "::jsonb" in default_sql:
+                column.server_default = None
+
+
+@pytest.fixture(scope="session")
+def sqlite_dialect() -> None:
+    _patch_sqlite_dialect()
+
+
+@pytest.fixture(scope="session")
+def auth_engine(sqlite_dialect: None) -> Iterator[Engine]:
+    # One shared in-memory connection; the attached :memory: schemas live as long as it does.
+    engine = create_engine(
+        "sqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _attach_schemas(dbapi_connection, connection_record):  # type: ignore[override]
+        # Let SQLAlchemy issue BEGIN/SAVEPOINT itself; pysqlite's implicit transactions break savepoints.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        dbapi_connection.create_function("true", 0, lambda: 1)
+        dbapi_connection.create_function("false", 0, lambda: 0)
+        cursor.execute("ATTACH DATABASE ':memory:' AS auth")
+        cursor.execute("ATTACH DATABASE ':memory:' AS audit")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):  # type: ignore[override]
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture()
+def auth_session_factory(auth_engine: Engine) -> Iterator[sessionmaker[SASession]]:
+    # Each test runs inside an outer transaction; commits made through the factory only release savepoints.
+    connection = auth_engine.connect()
+    transaction = connection.begin()
+    try:
+        yield sessionmaker(
+            bind=connection,
+            expire_on_commit=False,
+            future=True,
+            class_=SASession,
+            join_transaction_mode="create_savepoint",
+        )
+    finally:
+        transaction.rollback()
+        connection.close()
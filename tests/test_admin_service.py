@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-from pathlib import Path
+from types import SimpleNamespace
 from typing import Iterator
 
 import pytest
-from sqlalchemy import create_engine, event, text as sa_text
-from sqlalchemy.dialects.sqlite.base import SQLiteTypeCompiler
+from sqlalchemy import Engine
 from sqlalchemy.orm import Session as SASession, sessionmaker
 
 from app.admin import (
@@ -16,64 +15,59 @@ from app.admin import (
     DuplicateRoleError,
     NotFoundError,
 )
+from app.auth.service import AuthService
 from app.core.settings import Settings
-from app.db.base import Base
 from app.db.models import Report, User
 
 
+_SETTINGS = Settings()
+
+
+def _stub_hash_password(self: AuthService, plain_password: str) -> str:
+    return f"stub::{plain_password}"
+
+
+def _stub_verify_password(self: AuthService, plain_password: str, password_hash: str) -> bool:
+    return bool(password_hash) and password_hash == _stub_hash_password(self, plain_password)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def stub_password_hashing() -> Iterator[None]:
+    # bcrypt is deliberately slow; every AuthService built during these tests gets a cheap hash and check.
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(AuthService, "hash_password", _stub_hash_password)
+        patch.setattr(AuthService, "verify_password", _stub_verify_password)
+        yield
+
+
+@pytest.fixture(scope="session")
+def seeded(auth_engine: Engine) -> SimpleNamespace:
+    """Roles and a report committed once; tests read them and their changes are rolled back."""
+    session_factory = sessionmaker(bind=auth_engine, expire_on_commit=False, future=True, class_=SASession)
+    service = AdminService(session_factory=session_factory, settings=_SETTINGS)
+    with service.transaction():
+        auditor = service.create_role(CreateRolePayload(role_name="_seed_auditor", permissions={"dashboard": ["read"]}))
+        admin_role = service.create_role(CreateRolePayload(role_name="admin", permissions={"admin": ["read"]}))
+        with service._session_scope() as session:  # type: ignore[attr-defined]
+            report = Report(report_code="sales_dashboard", report_name="Продажи и прибыль")
+            report.is_active = True
+            session.add(report)
+            session.flush()
+            report_id = report.report_id
+    return SimpleNamespace(auditor=auditor, admin_role=admin_role, report_id=report_id)
+
+
 @pytest.fixture()
-def admin_service(tmp_path: Path) -> Iterator[AdminService]:
-    main_db = tmp_path / "main.db"
-    auth_db = tmp_path / "auth.db"
-    audit_db = tmp_path / "audit.db"
-
-    if not hasattr(SQLiteTypeCompiler, "visit_JSONB"):
-        def _visit_jsonb(self, type_, **kw):  # type: ignore[override]
-            return "TEXT"
-
-        SQLiteTypeCompiler.visit_JSONB = _visit_jsonb  # type: ignore[attr-defined]
-
-    if not hasattr(SQLiteTypeCompiler, "visit_INET"):
-        def _visit_inet(self, type_, **kw):  # type: ignore[override]
-            return "TEXT"
-
-        SQLiteTypeCompiler.visit_INET = _visit_inet  # type: ignore[attr-defined]
-
-    engine = create_engine(f"sqlite:///{main_db}", future=True)
-
-    for table in Base.metadata.tables.values():
-        for column in table.columns:
-            default = column.server_default
-            if default is None:
-                continue
-            default_sql = str(getattr(default, "arg", default))
-            if "::jsonb" in default_sql:
-                column.server_default = None
-
-    @event.listens_for(engine, "connect")
-    def _attach_schemas(dbapi_connection, connection_record):  # type: ignore[override]
-        cursor = dbapi_connection.cursor()
-        dbapi_connection.create_function("true", 0, lambda: 1)
-        dbapi_connection.create_function("false", 0, lambda: 0)
-        cursor.execute("ATTACH DATABASE ? AS auth", (str(auth_db),))
-        cursor.execute("ATTACH DATABASE ? AS audit", (str(audit_db),))
-        cursor.close()
-
-    Base.metadata.create_all(engine)
-    session_factory = sessionmaker(bind=engine, expire_on_commit=False, future=True, class_=SASession)
-    settings = Settings()
-    service = AdminService(session_factory=session_factory, settings=settings)
-
-    class _StubAuthService:
-        @staticmethod
-        def hash_password(password: str) -> str:
-            return f"stub::{password}"
-
-    service._auth_service = _StubAuthService()  # type: ignore[attr-defined]
-    try:
-        yield service
-    finally:
-        engine.dispose()
+def admin_service(auth_session_factory: sessionmaker[SASession]) -> AdminService:
+    return AdminService(session_factory=auth_session_factory, settings=_SETTINGS)
+
+
+@pytest.fixture()
+def db_session(admin_service: AdminService) -> Iterator[SASession]:
+    # The whole test shares this session with the service calls it makes.
+    with admin_service.transaction():
+        with admin_service._session_scope() as session:  # type: ignore[attr-defined]
+            yield session
 
 
 def test_create_role_returns_summary(admin_service: AdminService) -> None:
@@ -95,7 +89,7 @@ def test_duplicate_role_name_raises(admin_service: AdminService) -> None:
         admin_service.create_role(payload)
 
 
-def test_create_user_assigns_roles_and_groups(admin_service: AdminService) -> None:
+def test_create_user_assigns_roles_and_groups(admin_service: AdminService, db_session: SASession) -> None:
     role = admin_service.create_role(CreateRolePayload(role_name="analyst", permissions={"reports": ["view"]}))
     group = admin_service.create_group(
         CreateGroupPayload(group_name="analytics", description=None, role_ids=[role.role_id])
@@ -119,10 +113,10 @@ def test_create_user_assigns_roles_and_groups(admin_service: AdminService) -> No
     assert summary.role_ids == [role.role_id]
     assert summary.group_ids == [group.group_id]
 
-    with admin_service._session_scope() as session:  # type: ignore[attr-defined]
-        user = session.get(User, summary.user_id)
-        assert user is not None
-        assert user.password_hash != "password123"
+    db_session.expire_all()
+    user = db_session.get(User, summary.user_id)
+    assert user is not None
+    assert user.password_hash != "password123"
 
 
 def test_assign_role_to_user_is_idempotent(admin_service: AdminService) -> None:
@@ -182,17 +176,20 @@ def test_update_role_changes_attributes(admin_service: AdminService) -> None:
 
 
 def test_update_user_modifies_profile(admin_service: AdminService) -> None:
-    role = admin_service.create_role(CreateRolePayload(role_name="reader", permissions={"reports": ["read"]}))
-    group = admin_service.create_group(CreateGroupPayload(group_name="ops", description=None, role_ids=[role.role_id]))
-    user = admin_service.create_user(
-        CreateUserPayload(
-            username="katya",
-            email="katya@example.com",
-            password="secret",
-            role_ids=[role.role_id],
-            group_ids=[group.group_id],
+    with admin_service.transaction():
+        role = admin_service.create_role(CreateRolePayload(role_name="reader", permissions={"reports": ["read"]}))
+        group = admin_service.create_group(
+            CreateGroupPayload(group_name="ops", description=None, role_ids=[role.role_id])
+        )
+        user = admin_service.create_user(
+            CreateUserPayload(
+                username="katya",
+                email="katya@example.com",
+                password="secret",
+                role_ids=[role.role_id],
+                group_ids=[group.group_id],
+            )
         )
-    )
 
     updated = admin_service.update_user(
         user.user_id,
@@ -210,7 +207,7 @@ def test_update_user_modifies_profile(admin_service: AdminService) -> None:
     assert updated.group_ids == []
 
 
-def test_update_user_changes_password(admin_service: AdminService) -> None:
+def test_update_user_changes_password(admin_service: AdminService, db_session: SASession) -> None:
     user = admin_service.create_user(
         CreateUserPayload(
             username="dmitry",
@@ -221,16 +218,21 @@ def test_update_user_changes_password(admin_service: AdminService) -> None:
 
     admin_service.update_user(user.user_id, password="new-pass")
 
-    with admin_service._session_scope() as session:  # type: ignore[attr-defined]
-        db_user = session.get(User, user.user_id)
-        assert db_user is not None
-        assert db_user.password_hash == "stub::new-pass"
+    db_session.expire_all()
+    db_user = db_session.get(User, user.user_id)
+    assert db_user is not None
+    assert db_user.password_hash == "stub::new-pass"
 
 
 def test_update_group_assigns_roles(admin_service: AdminService) -> None:
-    analyst = admin_service.create_role(CreateRolePayload(role_name="analyst", permissions={"reports": ["read"]}))
-    reviewer = admin_service.create_role(CreateRolePayload(role_name="reviewer", permissions={"reports": ["approve"]}))
-    group = admin_service.create_group(CreateGroupPayload(group_name="reviewers", description=None, role_ids=[analyst.role_id]))
+    with admin_service.transaction():
+        analyst = admin_service.create_role(CreateRolePayload(role_name="analyst", permissions={"reports": ["read"]}))
+        reviewer = admin_service.create_role(
+            CreateRolePayload(role_name="reviewer", permissions={"reports": ["approve"]})
+        )
+        group = admin_service.create_group(
+            CreateGroupPayload(group_name="reviewers", description=None, role_ids=[analyst.role_id])
+        )
 
     updated = admin_service.update_group(
         group.group_id,
@@ -244,15 +246,8 @@ def test_update_group_assigns_roles(admin_service: AdminService) -> None:
     assert updated.role_ids == [reviewer.role_id]
 
 
-def test_assign_and_remove_report_from_role(admin_service: AdminService) -> None:
-    role = admin_service.create_role(CreateRolePayload(role_name="auditor", permissions={"dashboard": ["read"]}))
-
-    with admin_service._session_scope() as session:  # type: ignore[attr-defined]
-        report = Report(report_code="sales_dashboard", report_name="Продажи и прибыль")
-        report.is_active = True
-        session.add(report)
-        session.flush()
-        report_id = report.report_id
+def test_assign_and_remove_report_from_role(admin_service: AdminService, seeded: SimpleNamespace) -> None:
+    role, report_id = seeded.auditor, seeded.report_id
 
     summary = admin_service.assign_report_to_role(role.role_id, report_id)
     assert summary.report_ids == [report_id]
@@ -270,32 +265,37 @@ def test_assign_and_remove_report_from_role(admin_service: AdminService) -> None
     assert summary.reports == []
 
 
-def test_admin_role_receives_all_reports(admin_service: AdminService) -> None:
-    admin_role = admin_service.create_role(CreateRolePayload(role_name="admin", permissions={"admin": ["read"]}))
+def test_admin_role_receives_all_reports(
+    admin_service: AdminService, db_session: SASession, seeded: SimpleNamespace
+) -> None:
+    report = Report(report_code="finance_dashboard", report_name="Финансы")
+    report.is_active = True
+    db_session.add(report)
+    db_session.flush()
+    report_id = report.report_id
 
-    with admin_service._session_scope() as session:  # type: ignore[attr-defined]
-        report = Report(report_code="finance_dashboard", report_name="Финансы")
-        report.is_active = True
-        session.add(report)
-        session.flush()
-        report_id = report.report_id
-
-    refreshed = next(role for role in admin_service.list_roles(include_inactive=True) if role.role_name == "admin")
+    refreshed = next(
+        role for role in admin_service.list_roles(include_inactive=True) if role.role_id == seeded.admin_role.role_id
+    )
     assert report_id in refreshed.report_ids
+    assert seeded.report_id in refreshed.report_ids
 
 
 def test_delete_user_and_group(admin_service: AdminService) -> None:
-    role = admin_service.create_role(CreateRolePayload(role_name="auditor", permissions={"reports": ["read"]}))
-    group = admin_service.create_group(CreateGroupPayload(group_name="auditors", description=None, role_ids=[role.role_id]))
-    user = admin_service.create_user(
-        CreateUserPayload(
-            username="mark",
-            email="mark@example.com",
-            password="secret",
-            role_ids=[role.role_id],
-            group_ids=[group.group_id],
+    with admin_service.transaction():
+        role = admin_service.create_role(CreateRolePayload(role_name="auditor", permissions={"reports": ["read"]}))
+        group = admin_service.create_group(
+            CreateGroupPayload(group_name="auditors", description=None, role_ids=[role.role_id])
+        )
+        user = admin_service.create_user(
+            CreateUserPayload(
+                username="mark",
+                email="mark@example.com",
+                password="secret",
+                role_ids=[role.role_id],
+                group_ids=[group.group_id],
+            )
         )
-    )
 
     admin_service.delete_user(user.user_id)
     admin_service.delete_group(group.group_id)
@@ -307,4 +307,28 @@ def test_delete_user_and_group(admin_service: AdminService) -> None:
         admin_service.delete_user(user.user_id)
 
     with pytest.raises(NotFoundError):
-        admin_service.delete_group(group.group_id)
\ No newline at end of file
+        admin_service.delete_group(group.group_id)
+
+
+def test_transaction_rolls_back_every_operation_on_error(admin_service: AdminService) -> None:
+    with pytest.raises(DuplicateRoleError):
+        with admin_service.transaction():
+            admin_service.create_role(CreateRolePayload(role_name="batch", permissions=None))
+            admin_service.create_role(CreateRolePayload(role_name="batch", permissions=None))
+
+    assert "batch" not in {role.role_name for role in admin_service.list_roles(include_inactive=True)}
+
+
+def test_nested_transaction_failure_rolls_back_earlier_operations(admin_service: AdminService) -> None:
+    with pytest.raises(NotFoundError):
+        with admin_service.transaction():
+            admin_service.create_role(CreateRolePayload(role_name="outer_batch", permissions=None))
+            with admin_service.transaction():
+                admin_service.create_group(CreateGroupPayload(group_name="inner_batch"))
+                admin_service.create_user(
+                    CreateUserPayload(username="ghost", email="ghost@example.com", password="secret", role_ids=[987654])
+                )
+
+    assert "outer_batch" not in {role.role_name for role in admin_service.list_roles(include_inactive=True)}
+    assert "inner_batch" not in {group.group_name for group in admin_service.list_groups(include_inactive=True)}
+    assert "ghost" not in {user.username for user in admin_service.list_users(include_inactive=True)}
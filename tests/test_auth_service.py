@@ -6,7 +6,7 @@ from app.auth.service import AuthService
 from app.db.models import Group, Role, RoleReport, Report, User
 
 
-@pytest.fixture()
+@pytest.fixture(scope="module")
 def auth_service() -> AuthService:
     return AuthService()
 
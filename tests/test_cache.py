@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", "first")
+    cache.set("b", "second")
+    assert cache.get("a") == "first"
+
+    cache.set("c", "third")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "first"
+    assert cache.get("c") == "third"
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[int] = TTLCache(maxsize=4, ttl=0.01)
+    cache.set("key", 1)
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_pop_discards_entry() -> None:
+    cache: TTLCache[str] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", "first")
+
+    cache.pop("a")
+    cache.pop("missing")
+
+    assert cache.get("a") is None
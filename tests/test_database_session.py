@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import pytest
+from flask import Flask, session
+from flask.testing import FlaskClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session as SASession, sessionmaker
+
+from app.auth.session import DatabaseSessionInterface
+from app.core.settings import Settings
+from app.db.models import User, UserSession
+
+
+_SETTINGS = Settings()
+_COOKIE = _SETTINGS.session_cookie_name
+
+
+def _make_app(interface: DatabaseSessionInterface, during_request: Callable[[], None] = lambda: None) -> Flask:
+    server = Flask(__name__)
+    server.session_interface = interface
+
+    @server.route("/login/<int:user_id>")
+    def login(user_id: int):
+        session["user_id"] = user_id
+        return "ok"
+
+    @server.route("/whoami")
+    def whoami():
+        during_request()
+        session["seen"] = True
+        return str(session.get("user_id"))
+
+    return server
+
+
+def _is_active(session_factory: sessionmaker[SASession], sid: str) -> bool:
+    with session_factory() as db:
+        return db.execute(select(UserSession.is_active).where(UserSession.session_token == sid)).scalar_one()
+
+
+def _sid(client: FlaskClient) -> str | None:
+    cookie = client.get_cookie(_COOKIE)
+    return cookie.value if cookie else None
+
+
+@pytest.fixture()
+def user_id(auth_session_factory: sessionmaker[SASession]) -> int:
+    with auth_session_factory() as db:
+        user = User(username="session_user", email="session_user@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        return user.user_id
+
+
+def test_session_revoked_on_another_worker_is_not_served_from_cache(
+    auth_session_factory: sessionmaker[SASession], user_id: int
+) -> None:
+    worker = DatabaseSessionInterface(session_factory=auth_session_factory, settings=_SETTINGS)
+    other_worker = DatabaseSessionInterface(session_factory=auth_session_factory, settings=_SETTINGS)
+    client = _make_app(worker).test_client()
+    client.get(f"/login/{user_id}")
+    sid = _sid(client)
+    assert client.get("/whoami").text == str(user_id)
+    assert worker._records.get(sid) is not None
+
+    # Logout handled by another process while this worker still caches the session payload.
+    other_worker._deactivate_session(sid)
+
+    assert client.get("/whoami").text == "None"
+    assert _sid(client) != sid
+    assert _is_active(auth_session_factory, sid) is False
+
+    # Replaying the old cookie never brings the session back.
+    client.set_cookie(_COOKIE, sid)
+    assert client.get("/whoami").text == "None"
+    assert _is_active(auth_session_factory, sid) is False
+
+
+def test_session_revoked_during_a_request_drops_the_cookie(
+    auth_session_factory: sessionmaker[SASession], user_id: int
+) -> None:
+    other_worker = DatabaseSessionInterface(session_factory=auth_session_factory, settings=_SETTINGS)
+    revoke: list[str] = []
+    app = _make_app(
+        DatabaseSessionInterface(session_factory=auth_session_factory, settings=_SETTINGS),
+        during_request=lambda: [other_worker._deactivate_session(sid) for sid in revoke],
+    )
+    client = app.test_client()
+    client.get(f"/login/{user_id}")
+    sid = _sid(client)
+    revoke.append(sid)
+
+    # The session was valid when opened, so this request still sees the user, but saving it must not
+    # reactivate the record.
+    assert client.get("/whoami").text == str(user_id)
+    assert _sid(client) is None
+    assert _is_active(auth_session_factory, sid) is False
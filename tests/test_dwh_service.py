@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import pytest
+
+from app.dwh import DashboardQueryParams, DwhDashboardService, InvalidColumnFilterError
+
+
+@pytest.fixture(scope="module")
+def service() -> DwhDashboardService:
+    return DwhDashboardService(session_factory=lambda: None)  # type: ignore[arg-type]
+
+
+def test_column_filters_match_like_metacharacters_literally(service: DwhDashboardService) -> None:
+    where, bound, _ = service._build_filters(
+        DashboardQueryParams(),
+        [("customer_name", "contains", "50%_off\\"), ("sale_date", "datestartswith", "2024_")],
+    )
+
+    assert "ILIKE :column_filter_0 ESCAPE '\\'" in where
+    assert "LIKE :column_filter_1 ESCAPE '\\'" in where
+    assert bound["column_filter_0"] == "%50\\%\\_off\\\\%"
+    assert bound["column_filter_1"] == "2024\\_%"
+
+
+def test_column_filters_reject_values_that_do_not_fit_the_column(service: DwhDashboardService) -> None:
+    with pytest.raises(InvalidColumnFilterError) as excinfo:
+        service._build_filters(DashboardQueryParams(), [("quantity", "=", "abc")])
+
+    assert excinfo.value.column == "quantity"
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import gzip
+
+from flask import Flask, jsonify
+
+from app import configure_response_compression
+
+
+def _make_app() -> Flask:
+    server = Flask(__name__)
+    configure_response_compression(server, min_size=64)
+
+    @server.route("/large")
+    def large():
+        return jsonify({"values": list(range(200))})
+
+    @server.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    return server
+
+
+def test_large_json_is_gzipped_when_accepted() -> None:
+    client = _make_app().test_client()
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, deflate"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b'"values"' in gzip.decompress(response.get_data())
+
+
+def test_small_or_unaccepted_responses_are_untouched() -> None:
+    client = _make_app().test_client()
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/large").headers
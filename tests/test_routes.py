@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dash import no_update
+
+from app.ui.layout import ANONYMOUS_PERMISSIONS
+from app.ui.routes import _access_check, _identity_hash, _login_redirect, _session_snapshot
+
+
+def test_session_snapshot_reads_admin_flag_and_report_codes() -> None:
+    snapshot = _session_snapshot(
+        {
+            "user_id": 7,
+            "username": "alice",
+            "roles": "viewer",
+            "permissions": {"*": ["read"]},
+            "reports": [{"code": "sales_dashboard"}, {"name": "без кода"}, "broken"],
+        }
+    )
+
+    assert snapshot.display_name == "alice"
+    assert snapshot.roles == ("viewer",)
+    assert snapshot.is_admin is True
+    assert snapshot.report_codes == frozenset({"sales_dashboard"})
+
+
+def test_access_check_uses_declared_resource_and_code() -> None:
+    viewer = _session_snapshot({"user_id": 1, "permissions": {"dashboard": ["read"]}, "reports": [{"code": "deals"}]})
+
+    assert _access_check("dashboard", None)(viewer) is True
+    assert _access_check(None, "deals")(viewer) is True
+    assert _access_check("admin", "other")(viewer) is False
+    assert _access_check(None, None)(viewer) is False
+
+
+def test_identity_hash_ignores_role_order() -> None:
+    first = _session_snapshot({"user_id": 1, "roles": ["b", "a"]})
+    second = _session_snapshot({"user_id": 1, "roles": ["a", "b"]})
+
+    assert _identity_hash(first) == _identity_hash(second)
+    assert _identity_hash(first) != _identity_hash(_session_snapshot({"user_id": 2, "roles": ["a", "b"]}))
+
+
+def test_login_redirect_reloads_stale_signed_in_pages() -> None:
+    signed_in = {"authenticated": True, "admin": False}
+
+    assert _login_redirect("/", ANONYMOUS_PERMISSIONS) is no_update
+    assert _login_redirect("/login", ANONYMOUS_PERMISSIONS) is no_update
+    assert _login_redirect("/sales", ANONYMOUS_PERMISSIONS) == "/login"
+    assert _login_redirect("/", signed_in) == "/login"
+    assert _login_redirect("/sales", None) == "/login"
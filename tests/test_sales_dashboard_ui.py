@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.dwh import DashboardQueryParams, InvalidColumnFilterError
+from app.ui.reports import sales_dashboard
+from app.dwh.service import SCATTER_ROW_LIMIT
+from app.ui.reports.sales_dashboard import (
+    DASHBOARD_QUERIES,
+    MAX_SCATTER_POINTS,
+    _build_scatter_figure,
+    _count_sales,
+    _parse_filter_query,
+    _stratified_sample,
+)
+
+
+def test_scatter_thins_a_full_service_result_to_the_point_budget() -> None:
+    rows = [
+        {
+            "sale_id": index,
+            "quantity": index % 50,
+            "profit": float(index),
+            "total_amount": 100.0,
+            "category": "rare" if index % 1000 == 0 else "common",
+        }
+        for index in range(SCATTER_ROW_LIMIT)
+    ]
+
+    traces = _build_scatter_figure(rows)["data"]
+
+    assert sum(len(trace["x"]) for trace in traces) <= MAX_SCATTER_POINTS
+    assert {trace["name"] for trace in traces} == {"common", "rare"}
+
+
+def test_stratified_sample_keeps_every_group() -> None:
+    groups = {
+        "large": [{"id": index} for index in range(900)],
+        "small": [{"id": index} for index in range(5)],
+    }
+
+    sampled = _stratified_sample(groups, 100)
+
+    assert len(sampled["large"]) == 99
+    assert 1 <= len(sampled["small"]) <= 5
+
+
+def test_parse_filter_query_converts_values_to_column_types() -> None:
+    parsed = _parse_filter_query(
+        '{quantity} >= 5 && {customer_name} = 123 && {sale_date} < 2024-03-01 && {region} contains "50%"'
+    )
+
+    assert parsed == (
+        ("quantity", ">=", 5.0),
+        ("customer_name", "=", "123"),
+        ("sale_date", "<", date(2024, 3, 1)),
+        ("region", "contains", "50%"),
+    )
+
+
+@pytest.mark.parametrize(
+    ("filter_query", "expected"),
+    [
+        ('{product_name} contains "Orange juice"', ("product_name", "contains", "Orange juice")),
+        ("{customer_name} contains Anne Smith", ("customer_name", "contains", "Anne Smith")),
+        ('{region} contains "A=B"', ("region", "contains", "A=B")),
+        ("{payment_method} ne Online", ("payment_method", "!=", "Online")),
+        ("{quantity} ge 10", ("quantity", ">=", 10.0)),
+    ],
+)
+def test_parse_filter_query_reads_operator_right_after_column(filter_query: str, expected: tuple) -> None:
+    assert _parse_filter_query(filter_query) == (expected,)
+
+
+@pytest.mark.parametrize("filter_query", ["{quantity} = abc", "{sale_date} > вчера", "{profit} < nan"])
+def test_parse_filter_query_rejects_values_of_the_wrong_type(filter_query: str) -> None:
+    with pytest.raises(InvalidColumnFilterError):
+        _parse_filter_query(filter_query)
+
+
+class _CountingService:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def __getattr__(self, name: str):
+        if name not in DASHBOARD_QUERIES:
+            raise AttributeError(name)
+
+        def query(params, **options):
+            self.calls.append(name)
+            return 0 if name == "count_sales" else []
+
+        return query
+
+
+def test_unfiltered_count_reuses_the_prefetched_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sales_dashboard, "_QUERY_CACHE", TTLCache(maxsize=16, ttl=60))
+    service = _CountingService()
+    params = DashboardQueryParams(regions=["Север"])
+
+    sales_dashboard._run_query(service, "region_totals", params)
+    _count_sales(service, params, ())
+    _count_sales(service, params, (("quantity", ">", 1.0),))
+
+    assert service.calls.count("count_sales") == 2
+    assert sorted(service.calls) == sorted([*DASHBOARD_QUERIES, "count_sales"])
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from flask import Flask, session
+from flask.sessions import SecureCookieSessionInterface
+
+from app.auth.session import StaticRequestFilteringSessionInterface
+
+
+class _RecordingSessionInterface(SecureCookieSessionInterface):
+    def __init__(self) -> None:
+        self.opened: list[str] = []
+
+    def open_session(self, app, request):
+        self.opened.append(request.path)
+        return super().open_session(app, request)
+
+
+def _make_app() -> tuple[Flask, _RecordingSessionInterface]:
+    server = Flask(__name__)
+    server.secret_key = "test"
+    inner = _RecordingSessionInterface()
+    server.session_interface = StaticRequestFilteringSessionInterface(inner, ("/assets/", "/_dash-component-suites/"))
+
+    @server.route("/assets/app.js")
+    def asset():
+        return "asset"
+
+    @server.route("/page")
+    def page():
+        session["seen"] = True
+        return "page"
+
+    return server, inner
+
+
+def test_asset_requests_skip_session_store() -> None:
+    server, inner = _make_app()
+    client = server.test_client()
+
+    response = client.get("/assets/app.js")
+
+    assert response.status_code == 200
+    assert "Set-Cookie" not in response.headers
+    assert inner.opened == []
+
+
+def test_other_requests_use_wrapped_interface() -> None:
+    server, inner = _make_app()
+    client = server.test_client()
+
+    response = client.get("/page")
+
+    assert inner.opened == ["/page"]
+    assert "Set-Cookie" in response.headers
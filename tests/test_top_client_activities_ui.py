@@ -1,96 +1,163 @@
 from __future__ import annotations
 
-from typing import cast
+import json
+import shutil
+import subprocess
+from pathlib import Path
 
-import plotly.graph_objects as go
 import pytest
 
+from app.dwh import CategoryActivities, ClientActivityRow
+from app.ui.reports import top_client_activities
 from app.ui.reports.top_client_activities import (
-    _build_period_figure,
+    CHART_TYPE,
+    CHART_WRAPPER_TYPE,
+    FIGURE_CONFIG,
+    MAX_CATEGORIES,
+    PERIOD_LABELS,
+    PERIODS,
     _build_period_title,
     _deserialize_departments,
-    _empty_figure,
     _parse_chart_wrapper,
+    _serialize_categories,
+    _store_digest,
 )
 
 
-def _sample_category_entry() -> dict:
-    return {
-        "name": "Кредиты",
-        "clients": [
-            {
-                "client": "Клиент 1",
-                "issued_day": 15.0,
-                "repaid_day": 2.5,
-                "issued_week": 30.0,
-                "repaid_week": 5.0,
-                "issued_quarter": 45.0,
-                "repaid_quarter": 7.5,
-            },
-            {
-                "client": "Клиент 2",
-                "issued_day": 10.0,
-                "repaid_day": 6.0,
-                "issued_week": 18.0,
-                "repaid_week": 9.0,
-                "issued_quarter": 25.0,
-                "repaid_quarter": 12.0,
-            },
-        ],
-    }
-
-
-def test_build_period_figure_produces_dual_traces():
-    category_entry = _sample_category_entry()
-    figure = _build_period_figure(category_entry, "day")
-
-    assert isinstance(figure, go.Figure)
-    figure_obj = cast(go.Figure, figure)
-    traces = list(figure_obj.data)
-    assert len(traces) == 2
-
-    issued_trace = cast(go.Bar, traces[0])
-    repaid_trace = cast(go.Bar, traces[1])
-    assert issued_trace.orientation == "h"
-    assert repaid_trace.orientation == "h"
-
-    # Issued values remain positive while repaid values are rendered negative for symmetry.
-    issued_values = list(issued_trace.x or [])
-    repaid_values = list(repaid_trace.x or [])
-    assert all(value >= 0 for value in issued_values)
-    assert any(value < 0 for value in repaid_values)
-
-    # Custom payload should be present to support drill-down interactions.
-    issued_custom = issued_trace.customdata or []
-    repaid_custom = repaid_trace.customdata or []
-    issued_payloads = [item for item in issued_custom if isinstance(item, dict)]
-    repaid_payloads = [item for item in repaid_custom if isinstance(item, dict)]
-    assert issued_payloads and issued_payloads[0]["metric"] == "issued"
-    assert repaid_payloads and repaid_payloads[0]["metric"] == "repaid"
-
-    # X-axes should mirror for the two panels.
-    top_range = figure_obj.layout.xaxis.range
-    bottom_range = figure_obj.layout.xaxis2.range
-    assert top_range[0] < 0 < top_range[1]
-    assert bottom_range[0] < 0 < bottom_range[1]
-    assert top_range == pytest.approx(bottom_range)
-    assert figure_obj.layout.yaxis.visible is False
-    assert figure_obj.layout.yaxis2.visible is False
-
-    assert not figure_obj.layout.title.text
-
-
-def test_build_period_figure_returns_empty_placeholder_when_no_data():
-    category_entry = {"name": "Кредиты", "clients": []}
-    figure = _build_period_figure(category_entry, "day")
-    annotations = list(figure.layout.annotations)
-    assert annotations and annotations[0]["text"] == "Данные отсутствуют"
-
-
-def test_parse_chart_wrapper_extracts_index_and_period():
-    assert _parse_chart_wrapper("client-activities-chart-0-day-wrapper") == (0, "day")
-    assert _parse_chart_wrapper("client-activities-chart-2-week-wrapper") == (2, "week")
-    assert _parse_chart_wrapper("unexpected") is None
+def _client(name: str, **values: float) -> ClientActivityRow:
+    metrics = {f"{metric}_{period}": 0.0 for metric in ("issued", "repaid") for period in PERIODS}
+    metrics.update(values)
+    return ClientActivityRow(category="Кредиты", client=name, score=0.0, **metrics)
+
+
+@pytest.fixture(scope="module")
+def sample_store() -> dict:
+    clients = [
+        _client(f"Клиент {idx}", repaid_quarter=-50.0, **{f"issued_{period}": float(idx) for period in PERIODS})
+        for idx in range(1, 8)
+    ]
+    return _serialize_categories([CategoryActivities(category="Кредиты", clients=clients, score=1.0)])
+
+
+def test_serialize_categories_keeps_only_chart_fields(sample_store: dict):
+    entry = sample_store["categories"][0]
+    assert entry["name"] == "Кредиты"
+    assert entry["max"] == 50.0
+    assert entry["periods"]["quarter"]["repaid"] == {"clients": [], "values": [], "text": []}
+    assert "clients" not in entry
+
+
+@pytest.mark.parametrize("period", PERIODS)
+def test_serialize_categories_ships_sorted_top_clients_per_period(sample_store: dict, period: str):
+    issued = sample_store["categories"][0]["periods"][period]["issued"]
+    assert issued["clients"] == [f"Клиент {idx}" for idx in (7, 6, 5, 4, 3)]
+    assert issued["values"] == [7.0, 6.0, 5.0, 4.0, 3.0]
+    assert issued["text"] == ["7,00", "6,00", "5,00", "4,00", "3,00"]
+
+
+def test_serialize_categories_rounds_values_to_label_precision():
+    clients = [_client("Клиент", issued_week=123456789.123456789, repaid_week=0.004)]
+    store = _serialize_categories([CategoryActivities(category="Кредиты", clients=clients, score=1.0)])
+
+    week = store["categories"][0]["periods"]["week"]
+    assert week["issued"] == {"clients": ["Клиент"], "values": [123456789.12], "text": ["123 456 789,12"]}
+    assert week["repaid"]["clients"] == []
+
+
+def test_figure_config_is_json_serializable_for_clientside_render():
+    config = json.loads(json.dumps(FIGURE_CONFIG))
+
+    assert config["periods"] == list(PERIODS)
+    assert config["maxCategories"] == MAX_CATEGORIES
+    assert config["template"]["layout"]
+    layout = config["periodLayout"]
+    assert layout["yaxis"]["domain"] == [0.5, 1.0]
+    assert layout["yaxis2"]["domain"] == [0.0, 0.5]
+    # Client names sit on the shared zero line, on opposite sides for the mirrored panels.
+    assert layout["yaxis"]["position"] == layout["yaxis2"]["position"] == 0.5
+    assert (layout["yaxis"]["side"], layout["yaxis2"]["side"]) == ("left", "right")
+
+
+def test_chart_ids_are_laid_out_in_render_order(monkeypatch: pytest.MonkeyPatch):
+    # The ALL-pattern figure output is matched in layout order, and render() returns figures category by category.
+    monkeypatch.setattr(top_client_activities, "_service_or_none", lambda: None)
+    chart_ids = [
+        component.id
+        for component in top_client_activities.layout()._traverse()
+        if isinstance(getattr(component, "id", None), dict) and component.id.get("type") == CHART_TYPE
+    ]
+
+    assert chart_ids == [
+        {"type": CHART_TYPE, "idx": idx, "period": period} for idx in range(MAX_CATEGORIES) for period in PERIODS
+    ]
+
+
+_RENDER_SCRIPT = """
+global.window = {};
+require(process.argv[1]);
+let input = "";
+process.stdin.on("data", (chunk) => (input += chunk));
+process.stdin.on("end", () => {
+  const {store, config} = JSON.parse(input);
+  process.stdout.write(JSON.stringify(window.dash_clientside.client_activities.render(store, config)));
+});
+"""
+
+
+def _render_in_node(store: dict) -> list[dict]:
+    script = Path(top_client_activities.__file__).resolve().parents[2] / "assets" / "client_activities.js"
+    result = subprocess.run(
+        ["node", "-e", _RENDER_SCRIPT, str(script)],
+        input=json.dumps({"store": store, "config": FIGURE_CONFIG}),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is required to run the clientside renderer")
+def test_clientside_render_mirrors_bars_around_shared_range():
+    clients = [
+        _client("Альфа", issued_day=30.0, repaid_day=12.5),
+        _client("Бета", issued_day=10.0, repaid_week=40.0),
+    ]
+    store = _serialize_categories([CategoryActivities(category="Кредиты", clients=clients, score=1.0)])
+
+    figures = _render_in_node(store)
+
+    assert len(figures) == MAX_CATEGORIES * len(PERIODS)
+    day = figures[0]
+    issued, repaid = day["data"]
+    assert issued["y"] == ["Альфа", "Бета"] and issued["x"] == [30.0, 10.0]
+    assert repaid["y"] == ["Альфа"] and repaid["x"] == [-12.5]
+    assert (issued["xaxis"], issued["yaxis"], repaid["xaxis"], repaid["yaxis"]) == ("x", "y", "x2", "y2")
+    assert repaid["customdata"] == [{"category": "Кредиты", "client": "Альфа", "period": "day", "metric": "repaid"}]
+    # Both panels share one symmetric range sized by the category-wide maximum.
+    assert day["layout"]["xaxis"]["range"] == day["layout"]["xaxis2"]["range"] == [-42.0, 42.0]
+    assert day["layout"]["annotations"][0]["text"] == PERIOD_LABELS["day"]
+
+    quarter = figures[PERIODS.index("quarter")]
+    assert quarter["data"] == []
+    assert quarter["layout"]["annotations"][0]["text"] == FIGURE_CONFIG["messages"]["noData"]
+    assert all(
+        figure["layout"]["annotations"][0]["text"] == FIGURE_CONFIG["messages"]["noCategory"]
+        for figure in figures[len(PERIODS):]
+    )
+
+
+@pytest.mark.parametrize(
+    ("wrapper_id", "expected"),
+    [
+        ({"type": CHART_WRAPPER_TYPE, "idx": 0, "period": "day"}, (0, "day")),
+        ({"type": CHART_WRAPPER_TYPE, "idx": 2, "period": "week"}, (2, "week")),
+        ({"type": CHART_WRAPPER_TYPE, "idx": 1, "period": "month"}, None),
+        ({"type": "other", "idx": 0, "period": "day"}, None),
+        ("unexpected", None),
+    ],
+)
+def test_parse_chart_wrapper_extracts_index_and_period(wrapper_id, expected):
+    assert _parse_chart_wrapper(wrapper_id) == expected
 
 
 def test_build_period_title_formats_label():
@@ -105,7 +172,10 @@ def test_deserialize_departments_handles_multiple_shapes():
     assert _deserialize_departments(None) is None
 
 
-def test_empty_figure_contains_message():
-    figure = _empty_figure("Сообщение")
-    annotations = list(figure.layout.annotations)
-    assert annotations and annotations[0]["text"] == "Сообщение"
+def test_store_digest_ignores_key_order_but_not_values():
+    store = {"categories": [{"name": "Кредиты", "max": 1.0, "periods": {}}]}
+    reordered = {"categories": [{"periods": {}, "max": 1.0, "name": "Кредиты"}]}
+    changed = {"categories": [{"name": "Кредиты", "max": 2.0, "periods": {}}]}
+
+    assert _store_digest(store) == _store_digest(reordered)
+    assert _store_digest(store) != _store_digest(changed)